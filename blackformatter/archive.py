@@ -0,0 +1,37 @@
+import io
+import zipfile
+from typing import List, Tuple
+
+# Guards against zip bombs, these are checked against the sizes recorded in the archive
+# before anything is decompressed.
+MAX_ARCHIVE_FILES = 500
+MAX_ARCHIVE_SIZE = 25 * 1024 * 1024
+
+ArchiveFile = Tuple[str, bytes]
+
+
+def read_archive(data: bytes) -> List[ArchiveFile]:
+    """Read every file in a zip archive into memory as (path, contents) pairs.
+
+    Raises ``ValueError`` if the archive is invalid or too large.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+            if len(infos) > MAX_ARCHIVE_FILES:
+                raise ValueError(f"it contains more than {MAX_ARCHIVE_FILES} files")
+            if sum(info.file_size for info in infos) > MAX_ARCHIVE_SIZE:
+                raise ValueError("it is too large once decompressed")
+            return [(info.filename, archive.read(info)) for info in infos]
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError):
+        # RuntimeError is raised for encrypted files, NotImplementedError for unknown compression
+        raise ValueError("it isn't a valid zip archive") from None
+
+
+def write_archive(files: List[ArchiveFile]) -> bytes:
+    """Write (path, contents) pairs to a new zip archive in memory."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, contents in files:
+            archive.writestr(path, contents)
+    return buffer.getvalue()
@@ -1,20 +1,40 @@
+import asyncio
+import concurrent.futures
 import io
-from typing import Any, NoReturn, Optional
+from typing import Any, List, Literal, NoReturn, Optional, Tuple
 
 import black
 import discord
 from redbot.core import commands
 from redbot.core.bot import Red
+from redbot.core.utils.chat_formatting import box
+
+from .archive import ArchiveFile, read_archive, write_archive
+from .worker import (
+    FormatResult,
+    ResultCache,
+    WorkerPool,
+    add_diff_headers,
+    format_source,
+    source_hash,
+)
+
+MAX_FILES = 100
 
 
 class BlackFormatter(commands.Cog):
     """Run black on code."""
 
     __author__ = "Kreusada"
-    __version__ = "1.1.0"
+    __version__ = "1.4.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
+        self.pool = WorkerPool()
+        self.cache = ResultCache()
+
+    async def cog_unload(self) -> None:
+        self.pool.shutdown()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -24,21 +44,142 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """This cog does not store user data."""
         raise NotImplementedError
 
+    async def run_black(self, source: str, line_length: int) -> FormatResult:
+        """Format source code with black in a worker process.
+
+        Results are cached, so the same code is only formatted once per line length.
+        """
+        key = (source_hash(source), line_length)
+        if (result := self.cache.get(key)) is None:
+            result = await self.pool.run(format_source, source, line_length)
+            self.cache.set(key, result)
+        return result
+
+    async def format_file(
+        self, path: str, data: bytes, line_length: int
+    ) -> Tuple[bytes, str, str]:
+        """Format a file, returning its new contents, a line for the summary and its diff."""
+        try:
+            result = await self.run_black(data.decode(encoding="utf-8"), line_length)
+        except UnicodeDecodeError:
+            return data, f"{path}: could not be decoded", ""
+        except black.InvalidInput:
+            return data, f"{path}: could not be parsed", ""
+        except TimeoutError:
+            return data, f"{path}: took too long to format", ""
+        except MemoryError:
+            return data, f"{path}: used too much memory to format", ""
+        except concurrent.futures.process.BrokenProcessPool:
+            return data, f"{path}: the formatter crashed", ""
+        if result.output is None:
+            return data, f"{path}: unchanged", ""
+        return (
+            result.output.encode(encoding="utf-8"),
+            f"{path}: +{result.added} -{result.removed}",
+            add_diff_headers(result.diff, path),
+        )
+
+    @staticmethod
+    async def send_diff(
+        ctx: commands.Context, diff: str, filename: str, *, content: str = ""
+    ) -> None:
+        """Send a diff inline if it fits in the message, otherwise attach it."""
+        inline = box(diff, lang="diff")
+        if "```" not in diff and len(content) + len(inline) < 2000:
+            await ctx.send(f"{content}\n{inline}" if content else inline)
+        else:
+            await ctx.send(
+                content=content or None,
+                file=discord.File(io.BytesIO(diff.encode(encoding="utf-8")), filename=filename),
+            )
+
+    async def format_many(
+        self,
+        ctx: commands.Context,
+        attachments: List[discord.Attachment],
+        line_length: int,
+        *,
+        diff: bool = False,
+    ):
+        files: List[ArchiveFile] = []
+        for attachment in attachments:
+            filename = attachment.filename
+            if filename.lower().endswith(".zip"):
+                try:
+                    members = await asyncio.to_thread(read_archive, await attachment.read())
+                except ValueError as e:
+                    return await ctx.send(f"Could not read {filename}, {e}.")
+                # Keep archives apart when more than one file was attached
+                prefix = f"{filename[:-4]}/" if len(attachments) > 1 else ""
+                files.extend((prefix + path, data) for path, data in members)
+            elif filename.lower().endswith(".py"):
+                files.append((filename, await attachment.read()))
+            else:
+                return await ctx.send(f"{filename} is not a python file or zip archive.")
+
+        indexes = [i for i, (path, _) in enumerate(files) if path.lower().endswith(".py")]
+        if not indexes:
+            return await ctx.send("There are no python files to format.")
+        if len(indexes) > MAX_FILES:
+            return await ctx.send(f"You can only format up to {MAX_FILES} python files at once.")
+
+        results = await asyncio.gather(
+            *(self.format_file(*files[i], line_length) for i in indexes)
+        )
+        summary = []
+        patches = []
+        for i, (data, line, patch) in zip(indexes, results):
+            files[i] = (files[i][0], data)
+            summary.append(line)
+            patches.append(patch)
+
+        content = box("\n".join(summary))
+        attachment_files = []
+        if len(content) > 2000:
+            content = "See the attached summary for the changes made to each file."
+            attachment_files.append(
+                discord.File(io.BytesIO("\n".join(summary).encode("utf-8")), "summary.txt")
+            )
+        if diff:
+            patch = "".join(patches)
+            if patch and not attachment_files:
+                return await self.send_diff(ctx, patch, "formatted.diff", content=content)
+            filename, output = "formatted.diff", patch.encode(encoding="utf-8")
+        else:
+            filename = attachments[0].filename if len(attachments) == 1 else "formatted.zip"
+            output = await asyncio.to_thread(write_archive, files)
+        if ctx.guild is not None and len(output) > ctx.guild.filesize_limit:
+            return await ctx.send("The formatted files are too large to upload here.")
+        if output:
+            attachment_files.insert(0, discord.File(io.BytesIO(output), filename=filename))
+        await ctx.send(content=content, files=attachment_files)
+
     @commands.has_permissions(attach_files=True)
-    @commands.command(name="black", usage="<file> [line_length=None]")
-    async def _black(self, ctx: commands.Context, line_length: Optional[int] = None):
-        """Format a python file with black.
+    @commands.command(name="black", usage="<files> [line_length=None] [--diff]")
+    async def _black(
+        self,
+        ctx: commands.Context,
+        line_length: Optional[int] = None,
+        diff: Optional[Literal["--diff"]] = None,
+    ):
+        """Format python files with black.
 
-        You need to attach a file to this command, and it's extension needs to be `.py`.
+        You need to attach files to this command, and their extensions need to be `.py`.
+        You may also attach `.zip` archives, the python files inside them are formatted and
+        a new archive is sent back, along with a summary of the lines changed in each file.
         Your `line_length` is black setting. If it is not provided, it defaults to the
         configured black line length (the default, unchanged, is 88).
+        Add `--diff` to get a unified diff of the changes instead of the formatted files.
         """
         async with ctx.typing():
-            if not ctx.message.attachments:
+            attachments = ctx.message.attachments
+            if not attachments:
                 return await ctx.send_help()
-            attachment_file = ctx.message.attachments[0]
-            if not attachment_file.filename.lower().endswith(".py"):
-                return await ctx.send("Must be a python file.")
+            if len(attachments) > 1 or not attachments[0].filename.lower().endswith(".py"):
+                return await self.format_many(
+                    ctx, attachments, line_length or 88, diff=diff is not None
+                )
+            attachment_file = attachments[0]
 
             file = await attachment_file.read()
             try:
@@ -47,21 +188,25 @@ async def _black(self, ctx: commands.Context, line_length: Optional[int] = None)
                 return await ctx.send("Something went wrong when trying to decode this file.")
 
             try:
-                output = black.format_file_contents(
-                    sort,
-                    fast=True,
-                    mode=black.FileMode(line_length=line_length or 88),
-                )
-            except Exception as e:
-                if type(e).__name__ == "NothingChanged":
-                    await ctx.send("There was nothing to change in this code.")
-                else:
-                    raise
+                result = await self.run_black(sort, line_length or 88)
+            except TimeoutError:
+                await ctx.send("This file took too long to format.")
+            except MemoryError:
+                await ctx.send("This file used too much memory to format.")
+            except concurrent.futures.process.BrokenProcessPool:
+                await ctx.send("The formatter crashed while formatting this file.")
             else:
+                if result.output is None:
+                    return await ctx.send("There was nothing to change in this code.")
+                filename = attachment_file.filename.lower()
+                if diff is not None:
+                    return await self.send_diff(
+                        ctx, add_diff_headers(result.diff, filename), f"{filename[:-3]}.diff"
+                    )
                 await ctx.send(
                     content="See the attached file below, with your formatted code.",
                     file=discord.File(
-                        io.BytesIO(output.encode(encoding="utf-8")),
-                        filename=attachment_file.filename.lower(),
+                        io.BytesIO(result.output.encode(encoding="utf-8")),
+                        filename=filename,
                     ),
                 )
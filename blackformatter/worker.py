@@ -0,0 +1,191 @@
+import asyncio
+import concurrent.futures
+import difflib
+import functools
+import hashlib
+import itertools
+import multiprocessing
+import pathlib
+import signal
+import site
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple, TypeVar
+
+import black
+
+try:
+    import resource
+except ModuleNotFoundError:  # Windows
+    resource = None
+
+T = TypeVar("T")
+CacheKey = Tuple[str, int]
+
+MAX_WORKERS = 2
+JOB_TIMEOUT = 10
+# If a job overruns without the worker interrupting it, the pool is replaced after this long
+KILL_GRACE = 5
+MEMORY_LIMIT = 1024 * 1024 * 1024
+CACHE_SIZE = 64
+
+_memory_limited = False
+
+
+class FormatResult(NamedTuple):
+    # None if nothing changed
+    output: Optional[str]
+    added: int = 0
+    removed: int = 0
+    # A unified diff without its file headers, see ``add_diff_headers``
+    diff: str = ""
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class JobTimeout(Exception):
+    """Raised inside a worker when its job runs out of time.
+
+    This isn't a ``TimeoutError``, so that it can be told apart from the pool's own
+    deadline, which is only hit when a worker couldn't interrupt itself.
+    """
+
+
+def _timed_out(signum: int, frame: Any) -> None:
+    raise JobTimeout
+
+
+def limit_resources(timeout: int) -> None:
+    """Cap the worker's memory and interrupt it once the job has run for ``timeout`` seconds.
+
+    Both limits rely on POSIX APIs, elsewhere only the timeout in ``WorkerPool.run`` applies.
+    """
+    global _memory_limited
+    if resource is not None and not _memory_limited:
+        resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+        _memory_limited = True
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _timed_out)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+
+def clear_timeout() -> None:
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def make_diff(before: str, after: str) -> Tuple[str, int, int]:
+    """Get a unified diff between two versions of some code, without its file headers.
+
+    The number of lines added and removed are returned alongside it.
+    """
+    added = removed = 0
+    lines = []
+    diff = difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="")
+    # Skip the ---/+++ file headers
+    for line in itertools.islice(diff, 2, None):
+        if line[0] == "+":
+            added += 1
+        elif line[0] == "-":
+            removed += 1
+        lines.append(line)
+    return "\n".join(lines), added, removed
+
+
+def add_diff_headers(diff: str, path: str) -> str:
+    return f"--- a/{path}\n+++ b/{path}\n{diff}\n"
+
+
+def format_source(source: str, line_length: int, timeout: int = JOB_TIMEOUT) -> FormatResult:
+    """Format source code with black.
+
+    This runs in a worker process.
+    """
+    limit_resources(timeout)
+    try:
+        output = black.format_file_contents(
+            source, fast=True, mode=black.FileMode(line_length=line_length)
+        )
+        diff, added, removed = make_diff(source, output)
+        return FormatResult(output, added, removed, diff)
+    except black.NothingChanged:
+        return FormatResult(None)
+    finally:
+        clear_timeout()
+
+
+class WorkerPool:
+    """A process pool which kills and replaces its workers when a job overruns."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        # Jobs only start their timeout once a worker is free to take them
+        self.slots = asyncio.Semaphore(max_workers)
+        self.executor = self._new_executor()
+
+    def _new_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        # Forking a running bot isn't safe, and spawned workers can't import this cog
+        # unless the directory it was loaded from is on their path.
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=site.addsitedir,
+            initargs=(str(pathlib.Path(__file__).parents[1]),),
+        )
+
+    @staticmethod
+    def _terminate(executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def restart(self, executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        # Jobs which were running alongside a broken one fail too, only replace the pool once
+        if executor is self.executor:
+            self.executor = self._new_executor()
+            self._terminate(executor)
+
+    async def run(self, func: Callable[..., T], *args: Any, timeout: int = JOB_TIMEOUT) -> T:
+        """Run a job in a worker process.
+
+        Raises ``TimeoutError`` if it takes longer than ``timeout`` seconds.
+        """
+        async with self.slots:
+            executor = self.executor
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(func, *args, timeout=timeout)
+            )
+            try:
+                return await asyncio.wait_for(future, timeout + KILL_GRACE)
+            except JobTimeout:
+                # The worker interrupted itself, so it's still usable
+                raise TimeoutError from None
+            except asyncio.TimeoutError:
+                self.restart(executor)
+                raise TimeoutError from None
+            except concurrent.futures.process.BrokenProcessPool:
+                self.restart(executor)
+                raise
+
+    def shutdown(self) -> None:
+        self._terminate(self.executor)
+
+
+class ResultCache:
+    """A least recently used cache of formatting results."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[CacheKey, FormatResult] = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[FormatResult]:
+        if (value := self._data.get(key)) is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: CacheKey, value: FormatResult) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import pathlib
+import string
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+API_URL = "https://www.thecocktaildb.com/api/json/v1/1/"
+SYNC_INTERVAL = 60 * 60 * 24
+CATALOG_VERSION = 1
+
+Drink = Dict[str, Any]
+
+
+def parse_drink(drink: Dict[str, Any]) -> Drink:
+    """Convert a thecocktaildb drink payload into the compact catalog format."""
+    ingredients = []
+    for i in range(1, 16):
+        ingredient = drink.get(f"strIngredient{i}")
+        if not ingredient:
+            break
+        measure = drink.get(f"strMeasure{i}")
+        ingredients.append([ingredient.strip(), measure.rstrip() if measure else None])
+    return {
+        "id": drink["idDrink"],
+        "name": drink["strDrink"],
+        "alcoholic": drink["strAlcoholic"] == "Alcoholic",
+        "glass": drink["strGlass"],
+        "instructions": drink["strInstructions"],
+        "thumb": drink["strDrinkThumb"],
+        "ingredients": ingredients,
+    }
+
+
+class CocktailCatalog:
+    """A local copy of thecocktaildb, indexed by drink name and by ingredient."""
+
+    def __init__(self, path: pathlib.Path, session: aiohttp.ClientSession):
+        self.path = path
+        self.session = session
+        self.drinks: Dict[str, Drink] = {}
+        self.ingredients: Dict[str, Optional[str]] = {}
+        self.synced_at: float = 0
+        self.name_index: Dict[str, str] = {}
+        self.ingredient_index: Dict[str, Set[str]] = {}
+        # Saves run in threads, and share the same temporary file
+        self.save_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.drinks)
+
+    async def request(self, endpoint: str) -> Dict[str, Any]:
+        async with self.session.get(API_URL + endpoint) as request:
+            if request.status != 200:
+                raise aiohttp.ClientResponseError(
+                    request.request_info, request.history, status=request.status
+                )
+            # thecocktaildb doesn't always serve json with the correct mimetype
+            return await request.json(content_type=None) or {}
+
+    def build_indexes(self) -> None:
+        self.name_index = {d["name"].lower(): drink_id for drink_id, d in self.drinks.items()}
+        self.ingredient_index = {}
+        for drink_id, drink in self.drinks.items():
+            for ingredient, _ in drink["ingredients"]:
+                self.ingredient_index.setdefault(ingredient.lower(), set()).add(drink_id)
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self.path.open(encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            json.dump(data, fp, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    async def load(self) -> None:
+        data = await asyncio.to_thread(self._read)
+        if not data or data.get("version") != CATALOG_VERSION:
+            return
+        self.drinks = data["drinks"]
+        self.ingredients = data["ingredients"]
+        self.synced_at = data["synced_at"]
+        self.build_indexes()
+
+    async def save(self) -> None:
+        async with self.save_lock:
+            # Copied, since descriptions can be added while the thread is writing
+            data = {
+                "version": CATALOG_VERSION,
+                "synced_at": self.synced_at,
+                "drinks": self.drinks,
+                "ingredients": dict(self.ingredients),
+            }
+            await asyncio.to_thread(self._write, data)
+
+    async def sync(self) -> None:
+        drinks: Dict[str, Drink] = {}
+        # The free API has no bulk endpoint, but every drink can be reached by its first letter
+        for character in string.ascii_lowercase + string.digits:
+            req = await self.request(f"search.php?f={character}")
+            for drink in req.get("drinks") or []:
+                drinks[drink["idDrink"]] = parse_drink(drink)
+        if not drinks:
+            return
+        req = await self.request("list.php?i=list")
+        ingredients = {
+            i["strIngredient1"]: self.ingredients.get(i["strIngredient1"])
+            for i in req.get("drinks") or []
+        }
+        for drink in drinks.values():
+            for ingredient, _ in drink["ingredients"]:
+                ingredients.setdefault(ingredient, self.ingredients.get(ingredient))
+        self.drinks = drinks
+        self.ingredients = ingredients
+        self.synced_at = time.time()
+        self.build_indexes()
+        await self.save()
+
+    async def sync_loop(self) -> None:
+        await self.load()
+        while True:
+            delay = self.synced_at + SYNC_INTERVAL - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.sync()
+            except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError):
+                await asyncio.sleep(60 * 10)
+                continue
+            if not self.drinks:
+                await asyncio.sleep(60 * 10)
+
+    def get_drink(self, name: str) -> Optional[Drink]:
+        name = name.lower()
+        if drink_id := self.name_index.get(name):
+            return self.drinks[drink_id]
+        # Mirror the API's search, which matches on substrings
+        matches = sorted((n for n in self.name_index if name in n), key=len)
+        if matches:
+            return self.drinks[self.name_index[matches[0]]]
+        return None
+
+    def get_ingredient(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for ingredient in self.ingredients:
+            if ingredient.lower() == name:
+                return ingredient
+        return None
+
+    async def set_description(self, ingredient: str, description: str) -> None:
+        """Store an ingredient's description, which the sync doesn't fetch."""
+        if not self.drinks:
+            # Nothing is saved until the first sync completes
+            return
+        self.ingredients[ingredient] = description
+        await self.save()
+
+    def drinks_with(self, ingredients: Iterable[str]) -> List[Drink]:
+        """Get every drink which uses all of the given ingredients."""
+        ids: Optional[Set[str]] = None
+        for ingredient in ingredients:
+            found = self.ingredient_index.get(ingredient.lower(), set())
+            ids = found.copy() if ids is None else ids & found
+            if not ids:
+                return []
+        return sorted((self.drinks[i] for i in ids or ()), key=lambda d: d["name"])
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, NoReturn
+import asyncio
+import random
+from typing import Any, NoReturn, Optional
 
 import aiohttp
 import discord
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import humanize_list, pagify
+from redbot.core.utils.views import SimpleMenu
 
+from .catalog import CocktailCatalog, Drink, parse_drink
+from .favourites import FavouritesStore
+
+FAVOURITES_PER_PAGE = 20
+API_ERROR_MESSAGE = "I couldn't reach thecocktaildb right now, please try again later."
 FAVOURITE_ICON = "https://cdn-icons-png.freepik.com/256/676/676624.png?semt=ais_hybrid"
 
 
@@ -32,16 +42,14 @@ async def callback(self, interaction: discord.Interaction):
             self.style = discord.ButtonStyle.green
             self.label = "Favourite"
             message = "Cocktail removed from favourites."
-            async with self.cog.config.user(interaction.user).favourites() as favourites:
-                favourites.remove(self.cocktail)
+            await self.cog.favourites_store.remove(interaction.user.id, self.cocktail)
             embed = self.view.message.embeds[0]
             embed.remove_author()
         else:
             self.style = discord.ButtonStyle.red
             self.label = "Unfavourite"
             message = "Cocktail added to favourites."
-            async with self.cog.config.user(interaction.user).favourites() as favourites:
-                favourites.append(self.cocktail)
+            await self.cog.favourites_store.add(interaction.user.id, self.cocktail)
             embed = self.view.message.embeds[0]
             embed.set_author(name="This cocktail is in your favourites!", icon_url=FAVOURITE_ICON)
         self.favourite = not self.favourite
@@ -76,9 +84,22 @@ def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, 719988449867989142, force_registration=True)
         self.config.register_user(favourites=[])
+        self.favourites_store = FavouritesStore(self.config)
+        self.session = aiohttp.ClientSession()
+        self.catalog = CocktailCatalog(cog_data_path(self) / "catalog.json", self.session)
+        self.sync_task: Optional[asyncio.Task] = None
 
     __author__ = "Kreusada"
-    __version__ = "1.0.2"
+    __version__ = "1.1.0"
+
+    async def cog_load(self):
+        self.sync_task = asyncio.create_task(self.catalog.sync_loop())
+
+    async def cog_unload(self):
+        if self.sync_task is not None:
+            self.sync_task.cancel()
+        await self.favourites_store.flush_all()
+        await self.session.close()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -88,34 +109,43 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Delete user data for GDPR compliance."""
         raise NotImplementedError
 
+    async def find_drink(self, name: str) -> Optional[Drink]:
+        if self.catalog.drinks:
+            if name == "random":
+                return random.choice(list(self.catalog.drinks.values()))
+            if drink := self.catalog.get_drink(name):
+                return drink
+        if name == "random":
+            req = await self.catalog.request("random.php")
+        else:
+            req = await self.catalog.request("search.php?s=" + name)
+        if drinks := req.get("drinks"):
+            return parse_drink(drinks[0])
+        return None
+
     @commands.group(invoke_without_command=True)
     async def cocktail(self, ctx: commands.Context, *, name: str):
         """Get information about a cocktail / cocktail related commands. Supply 'random' to retrieve a random cocktail."""
-        if name == "random":
-            req_str = "https://www.thecocktaildb.com/api/json/v1/1/random.php"
-        else:
-            req_str = "https://www.thecocktaildb.com/api/json/v1/1/search.php?s=" + name
-        async with aiohttp.ClientSession() as session:
-            async with session.get(req_str) as request:
-                req = await request.json()
-        drinks = req["drinks"]
-        if not drinks:
+        try:
+            drink = await self.find_drink(name)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return await ctx.send(API_ERROR_MESSAGE)
+        if drink is None:
             return await ctx.send(
                 f"Couldn't find a cocktail named '{name.title()}'. \N{SHRUG}\N{ZERO WIDTH JOINER}\N{MALE SIGN}\N{VARIATION SELECTOR-16} \N{TROPICAL DRINK}"
             )
-        drink = drinks[0]
         embed = discord.Embed(
-            title="\N{TROPICAL DRINK} " + drink["strDrink"],
+            title="\N{TROPICAL DRINK} " + drink["name"],
             colour=await ctx.embed_colour(),
         )
-        if drink["strAlcoholic"] == "Alcoholic":
+        if drink["alcoholic"]:
             embed.description = "-# This drink contains alcohol."
         else:
             embed.description = "-# This is an alcohol-free drink."
-        embed.set_image(url=drink["strDrinkThumb"])
-        embed.set_footer(text="\N{FIRE} Best served in a " + drink["strGlass"])
+        embed.set_image(url=drink["thumb"])
+        embed.set_footer(text="\N{FIRE} Best served in a " + drink["glass"])
 
-        favourite = drink["strDrink"] in await self.config.user(ctx.author).favourites()
+        favourite = await self.favourites_store.contains(ctx.author.id, drink["name"])
 
         if favourite:
             embed.set_author(
@@ -124,57 +154,99 @@ async def cocktail(self, ctx: commands.Context, *, name: str):
             )
         embed.add_field(
             name="Instructions",
-            value=drink["strInstructions"],
+            value=drink["instructions"],
             inline=False,
         )
 
         ingredients = []
-        for i in range(1, 16):
-            ingredient = drink[f"strIngredient{i}"]
-            if ingredient is None:
-                break
-            measure = drink[f"strMeasure{i}"]
-
+        for ingredient, measure in drink["ingredients"]:
             if measure is None:
                 string = ingredient
             else:
-                string = f"{ingredient} ({measure.rstrip()})"
+                string = f"{ingredient} ({measure})"
             ingredients.append(string)
         embed.add_field(name="Ingredients", value="\n".join(f"- {x}" for x in ingredients))
 
-        view = CocktailView(cog=self, cocktail=drink["strDrink"], favourite=favourite)
+        view = CocktailView(cog=self, cocktail=drink["name"], favourite=favourite)
         view.message = await ctx.send(embed=embed, view=view)
 
     @cocktail.command()
     async def favourites(self, ctx: commands.Context):
         """See your favourite cocktails."""
-        favourites = await self.config.user(ctx.author).favourites()
-        embed = discord.Embed(
-            title=f"\N{TROPICAL DRINK} {ctx.author.name}'s Favourite Cocktails",
-            description="\n".join(f"- {x}" for x in sorted(favourites)),
-        )
-        await ctx.send(embed=embed)
+        favourites = await self.favourites_store.sorted(ctx.author.id)
+        if not favourites:
+            return await ctx.send("You don't have any favourite cocktails yet.")
+        chunks = [
+            favourites[i : i + FAVOURITES_PER_PAGE]
+            for i in range(0, len(favourites), FAVOURITES_PER_PAGE)
+        ]
+        embeds = []
+        for index, chunk in enumerate(chunks, start=1):
+            embed = discord.Embed(
+                title=f"\N{TROPICAL DRINK} {ctx.author.name}'s Favourite Cocktails",
+                description="\n".join(f"- {x}" for x in chunk),
+            )
+            if len(chunks) > 1:
+                embed.set_footer(text=f"Page {index}/{len(chunks)}")
+            embeds.append(embed)
+        if len(embeds) == 1:
+            await ctx.send(embed=embeds[0])
+        else:
+            await SimpleMenu(embeds).start(ctx)  # type: ignore[arg-type]
 
     @cocktail.command()
     async def ingredient(self, ctx: commands.Context, *, name: str):
         """Get information about a cocktail ingredient."""
-        req_str = "https://www.thecocktaildb.com/api/json/v1/1/search.php?i=" + name
-        async with aiohttp.ClientSession() as session:
-            async with session.get(req_str) as request:
-                req = await request.json()
-        ingredients = req["ingredients"]
-        if not ingredients:
-            return await ctx.send(
-                f"Couldn't find an ingredients named '{name.title()}'. \N{SHRUG}\N{ZERO WIDTH JOINER}\N{MALE SIGN}\N{VARIATION SELECTOR-16} \N{TROPICAL DRINK}"
-            )
-        ingredient = ingredients[0]
+        ingredient = self.catalog.get_ingredient(name)
+        description = self.catalog.ingredients.get(ingredient) if ingredient else None
+        if description is None:
+            try:
+                req = await self.catalog.request("search.php?i=" + name)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return await ctx.send(API_ERROR_MESSAGE)
+            ingredients = req.get("ingredients")
+            if not ingredients:
+                return await ctx.send(
+                    f"Couldn't find an ingredients named '{name.title()}'. \N{SHRUG}\N{ZERO WIDTH JOINER}\N{MALE SIGN}\N{VARIATION SELECTOR-16} \N{TROPICAL DRINK}"
+                )
+            ingredient = ingredients[0]["strIngredient"]
+            description = ingredients[0]["strDescription"] or ""
+            await self.catalog.set_description(ingredient, description)
         embed = discord.Embed(
-            title=ingredient["strIngredient"],
+            title=ingredient,
             colour=await ctx.embed_colour(),
         )
-        if desc := ingredient["strDescription"]:
-            embed.description = desc.split("\n")[0]
+        if description:
+            embed.description = description.split("\n")[0]
         embed.set_image(
             url=f"https://www.thecocktaildb.com/images/ingredients/{name.replace(' ', '%20')}.png"
         )
         await ctx.send(embed=embed)
+
+    @cocktail.command(aliases=["whatcanimake"])
+    async def makeable(self, ctx: commands.Context, *, ingredients: str):
+        """See which cocktails can be made with the given ingredients.
+
+        Separate each ingredient with a comma.
+
+        **Example:**
+        - `[p]cocktail makeable vodka, lime juice`
+        """
+        if not self.catalog.drinks:
+            return await ctx.send(
+                "The cocktail catalog hasn't finished syncing yet, please try again later."
+            )
+        names = [i.strip() for i in ingredients.split(",") if i.strip()]
+        drinks = self.catalog.drinks_with(names)
+        if not drinks:
+            return await ctx.send(
+                f"Couldn't find any cocktails made with {humanize_list(names)}. \N{SHRUG}\N{ZERO WIDTH JOINER}\N{MALE SIGN}\N{VARIATION SELECTOR-16} \N{TROPICAL DRINK}"
+            )
+        description = "\n".join(f"- {d['name']}" for d in drinks)
+        embed = discord.Embed(
+            title=f"\N{TROPICAL DRINK} Cocktails made with {humanize_list(names)}"[:256],
+            description=next(pagify(description, page_length=4000)),
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_footer(text=f"{len(drinks)} cocktail{'' if len(drinks) == 1 else 's'} found")
+        await ctx.send(embed=embed)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, Set, Tuple
+
+from redbot.core import Config
+
+FLUSH_DELAY = 5
+
+
+class FavouritesStore:
+    """Cache users' favourite cocktails in memory and coalesce writes to Config.
+
+    Favourites are held as sets while the cog is loaded, and persisted as a
+    sorted list. Changes are written back after a short delay, so that toggling
+    a favourite several times in a row only results in a single write.
+    """
+
+    def __init__(self, config: Config, *, flush_delay: float = FLUSH_DELAY):
+        self.config = config
+        self.flush_delay = flush_delay
+        self.favourites: Dict[int, Set[str]] = {}
+        self.sorted_cache: Dict[int, Tuple[str, ...]] = {}
+        self.pending: Dict[int, asyncio.Task] = {}
+        self.lock = asyncio.Lock()
+
+    async def get(self, user_id: int) -> Set[str]:
+        if (favourites := self.favourites.get(user_id)) is not None:
+            return favourites
+        async with self.lock:
+            if user_id not in self.favourites:
+                stored = await self.config.user_from_id(user_id).favourites()
+                self.favourites[user_id] = set(stored)
+        return self.favourites[user_id]
+
+    async def contains(self, user_id: int, cocktail: str) -> bool:
+        return cocktail in await self.get(user_id)
+
+    async def sorted(self, user_id: int) -> Tuple[str, ...]:
+        if (cached := self.sorted_cache.get(user_id)) is None:
+            cached = self.sorted_cache[user_id] = tuple(sorted(await self.get(user_id)))
+        return cached
+
+    async def add(self, user_id: int, cocktail: str) -> None:
+        (await self.get(user_id)).add(cocktail)
+        self.mark_dirty(user_id)
+
+    async def remove(self, user_id: int, cocktail: str) -> None:
+        (await self.get(user_id)).discard(cocktail)
+        self.mark_dirty(user_id)
+
+    def mark_dirty(self, user_id: int) -> None:
+        self.sorted_cache.pop(user_id, None)
+        if user_id not in self.pending:
+            self.pending[user_id] = asyncio.create_task(self.delayed_flush(user_id))
+
+    async def delayed_flush(self, user_id: int) -> None:
+        await asyncio.sleep(self.flush_delay)
+        self.pending.pop(user_id, None)
+        await self.flush(user_id)
+
+    async def flush(self, user_id: int) -> None:
+        favourites = self.favourites.get(user_id)
+        if favourites is None:
+            return
+        await self.config.user_from_id(user_id).favourites.set(sorted(favourites))
+
+    async def flush_all(self) -> None:
+        pending, self.pending = self.pending, {}
+        for task in pending.values():
+            task.cancel()
+        for user_id in pending:
+            await self.flush(user_id)
@@ -1,17 +1,34 @@
+import asyncio
+import concurrent.futures
+import functools
 import io
 import re
-from typing import TYPE_CHECKING, Any, NoReturn
+from typing import TYPE_CHECKING, Any, Callable, List, NoReturn, Sequence
 
-import aiohttp
 import discord
-from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 from redbot.core import commands
+from redbot.core.data_manager import bundled_data_path
 from redbot.core.utils.chat_formatting import bold, inline
 
+from .conversions import (
+    RGB,
+    contrast_colour,
+    rgb_to_cmyk,
+    rgb_to_hsl,
+    rgb_to_hsv,
+    rgb_to_xyz,
+)
+from .names import ColourNames
+from .render import CacheKey, ImageCache, render_gradient, render_name, render_palette
+
 if TYPE_CHECKING:
     pass
 
 HEX_CODE_RE = re.compile(r"#?[0-9a-fA-F]{6}\b")
+# Renders share one cached font, which isn't safe to draw with from several threads at once
+MAX_WORKERS = 1
+MAX_COLOURS = 16
 
 
 class HexCodeConverter(commands.Converter[discord.Colour]):
@@ -32,7 +49,17 @@ class Colour(commands.Cog):
     """View information about a colour."""
 
     __author__ = "Kreusada"
-    __version__ = "1.1.2"
+    __version__ = "1.3.0"
+
+    def __init__(self):
+        self.names = ColourNames.from_file(bundled_data_path(self) / "colours.json")
+        self.image_cache = ImageCache()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="colour"
+        )
+
+    async def cog_unload(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -42,23 +69,48 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """This cog does not store user data."""
         raise NotImplementedError
 
-    @staticmethod
-    def generate_image(
-        *, colour: discord.Colour, name: str, constrast: discord.Colour
+    async def render(self, key: CacheKey, func: Callable[[], bytes]) -> io.BytesIO:
+        if (data := self.image_cache.get(key)) is None:
+            data = await asyncio.get_running_loop().run_in_executor(self.executor, func)
+            self.image_cache.set(key, data)
+        return io.BytesIO(data)
+
+    async def generate_image(
+        self, *, colour: discord.Colour, name: str, constrast: discord.Colour
     ) -> io.BytesIO:
-        img = Image.new("RGB", (1500, 500), colour.to_rgb())
-        drawer = ImageDraw.Draw(img)
-        font = ImageFont.load_default(size=100)
-        drawer.text((10, 0), name, fill=constrast.to_rgb(), font=font)
-        left, top, right, bottom = drawer.textbbox((10, 0), name, font=font)
-        cimg = img.crop((left - 10, top - 10, right + 10, bottom + 10))
-
-        buffer = io.BytesIO()
-        cimg.save(buffer, "png")
-        buffer.seek(0)
-        return buffer
-
-    @commands.command(aliases=["color"])
+        return await self.render(
+            (str(colour), name),
+            functools.partial(
+                render_name,
+                colour=colour.to_rgb(),
+                name=name,
+                contrast=constrast.to_rgb(),
+            ),
+        )
+
+    async def send_colours(
+        self,
+        ctx: commands.Context,
+        colours: Sequence[discord.Colour],
+        *,
+        kind: str,
+        renderer: Callable[[List[RGB]], bytes],
+        minimum: int,
+    ) -> None:
+        if not minimum <= len(colours) <= MAX_COLOURS:
+            await ctx.send(f"Please provide between {minimum} and {MAX_COLOURS} colours.")
+            return
+        rgbs = [colour.to_rgb() for colour in colours]
+        image = await self.render((kind, *map(str, colours)), functools.partial(renderer, rgbs))
+        description = "\n".join(
+            f"{inline(str(colour).upper())} {self.names.nearest(rgb)[1]}"
+            for colour, rgb in zip(colours, rgbs)
+        )
+        embed = discord.Embed(title=kind.title(), description=description, colour=colours[0])
+        embed.set_image(url=f"attachment://{kind}.png")
+        await ctx.send(embed=embed, file=discord.File(image, filename=f"{kind}.png"))
+
+    @commands.group(aliases=["color"], invoke_without_command=True)
     async def colour(
         self,
         ctx: commands.Context,
@@ -68,53 +120,79 @@ async def colour(
 
         Provide a HEX code or "random".
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://www.thecolorapi.com/id?hex={str(colour)[1:]}", ssl=False
-            ) as request:
-                data = await request.json()
-        if data["name"]["exact_match_name"]:
-            description = f"The provided colour is referred to as {bold(data['name']['value'])}.\n"
+        rgb = colour.to_rgb()
+        hex_code = str(colour)
+        closest_hex, name, exact = self.names.nearest(rgb)
+        contrast = contrast_colour(rgb)
+
+        if exact:
+            description = f"The provided colour is referred to as {bold(name)}.\n"
             description += "This is an *exact* name match."
         else:
-            description = (
-                f"The provided colour may be referred to as {bold(data['name']['value'])}.\n"
-            )
+            description = f"The provided colour may be referred to as {bold(name)}.\n"
             description += "This is not an *exact* name match, but is very similar to "
-            description += (
-                inline(data["name"]["closest_named_hex"])
-                + ", the colour which is given this name."
-            )
+            description += inline(closest_hex.upper()) + ", the colour which is given this name."
         embed = discord.Embed(
-            title=data["name"]["value"],
+            title=name,
             description=description,
             colour=colour,
         )
 
-        embed.add_field(name="Hex Code", value=data["hex"]["value"])
-        embed.add_field(name="RGB", value=data["rgb"]["value"])
-        embed.add_field(name="HSL", value=data["hsl"]["value"])
-        embed.add_field(name="HSV", value=data["hsv"]["value"])
-        embed.add_field(name="CMYK", value=data["cmyk"]["value"])
-        embed.add_field(name="XYZ", value=data["XYZ"]["value"])
+        h, s, l = rgb_to_hsl(rgb)  # noqa: E741
+        hsv = rgb_to_hsv(rgb)
+        cmyk = rgb_to_cmyk(rgb)
+        xyz = np.round(rgb_to_xyz(np.array(rgb)) * 100).astype(int)
+
+        embed.add_field(name="Hex Code", value=hex_code.upper())
+        embed.add_field(name="RGB", value="rgb({}, {}, {})".format(*rgb))
+        embed.add_field(name="HSL", value=f"hsl({h}, {s}%, {l}%)")
+        embed.add_field(name="HSV", value="hsv({}, {}%, {}%)".format(*hsv))
+        embed.add_field(name="CMYK", value="cmyk({}, {}, {}, {})".format(*cmyk))
+        embed.add_field(name="XYZ", value="XYZ({}, {}, {})".format(*xyz))
 
         writing_over = "\n\nWhen writing over {name}, it is visually clearer to use {choice} text, as shown in the image below.".format(
-            name=data["name"]["value"].lower(),
-            choice=(
-                "(white/~~black~~)"
-                if str(data["contrast"]["value"]) == "#ffffff"
-                else "(~~white~~/black)"
-            ),
+            name=name.lower(),
+            choice=("(white/~~black~~)" if contrast == (255, 255, 255) else "(~~white~~/black)"),
         )
 
         embed.add_field(name="Writing over", value=writing_over, inline=False)
 
-        embed.set_thumbnail(url=data["image"]["bare"])
+        embed.set_thumbnail(
+            url=f"https://www.thecolorapi.com/id?format=svg&named=false&hex={hex_code[1:]}"
+        )
         embed.set_image(url="attachment://image.png")
-        image = self.generate_image(
+        image = await self.generate_image(
             colour=colour,
-            name=data["name"]["value"].upper(),
-            constrast=discord.Colour(int(data["contrast"]["value"][1:], base=16)),
+            name=name.upper(),
+            constrast=discord.Colour.from_rgb(*contrast),
         )
 
         await ctx.send(embed=embed, file=discord.File(image, filename="image.png"))
+
+    @colour.command()
+    async def palette(self, ctx: commands.Context, *colours: HexCodeConverter):
+        """Preview a palette of up to 16 colours.
+
+        Provide HEX codes or "random", separated by spaces.
+        """
+        await self.send_colours(
+            ctx,
+            colours,  # type: ignore[arg-type]
+            kind="palette",
+            renderer=render_palette,
+            minimum=1,
+        )
+
+    @colour.command()
+    async def gradient(self, ctx: commands.Context, *colours: HexCodeConverter):
+        """Preview a smooth gradient through up to 16 colours.
+
+        Provide at least two HEX codes or "random", separated by spaces.
+        """
+        await self.send_colours(
+            ctx,
+            colours,  # type: ignore[arg-type]
+            kind="gradient",
+            renderer=render_gradient,
+            minimum=2,
+        )
@@ -0,0 +1,96 @@
+from typing import Tuple
+
+import numpy as np
+
+RGB = Tuple[int, int, int]
+
+# sRGB (D65) to CIE XYZ
+RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def linearize(rgb: np.ndarray) -> np.ndarray:
+    """Convert sRGB values in the range 0-255 to linear light in the range 0-1."""
+    c = np.asarray(rgb, dtype=float) / 255
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def rgb_to_xyz(rgb: np.ndarray) -> np.ndarray:
+    """Convert one or many sRGB colours to CIE XYZ, where Y is in the range 0-1."""
+    return linearize(rgb) @ RGB_TO_XYZ.T
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert one or many sRGB colours to CIELAB."""
+    t = rgb_to_xyz(rgb) / D65_WHITE
+    f = np.where(t > (6 / 29) ** 3, np.cbrt(t), t / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack(
+        [116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])],
+        axis=-1,
+    )
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """Get the WCAG relative luminance of one or many sRGB colours."""
+    return linearize(rgb) @ RGB_TO_XYZ[1]
+
+
+def contrast_colour(rgb: RGB) -> RGB:
+    """Get whichever of black or white text is more readable on the given colour."""
+    luminance = float(relative_luminance(np.array(rgb)))
+    # White wins when (1.05) / (L + 0.05) > (L + 0.05) / (0.05)
+    return (255, 255, 255) if (luminance + 0.05) ** 2 < 1.05 * 0.05 else (0, 0, 0)
+
+
+def _hue(r: float, g: float, b: float, high: float, delta: float) -> float:
+    if delta == 0:
+        return 0
+    if high == r:
+        hue = ((g - b) / delta) % 6
+    elif high == g:
+        hue = (b - r) / delta + 2
+    else:
+        hue = (r - g) / delta + 4
+    return hue * 60
+
+
+def rgb_to_hsl(rgb: RGB) -> Tuple[int, int, int]:
+    r, g, b = (x / 255 for x in rgb)
+    high, low = max(r, g, b), min(r, g, b)
+    delta = high - low
+    lightness = (high + low) / 2
+    saturation = 0 if delta == 0 else delta / (1 - abs(2 * lightness - 1))
+    return (
+        round(_hue(r, g, b, high, delta)),
+        round(saturation * 100),
+        round(lightness * 100),
+    )
+
+
+def rgb_to_hsv(rgb: RGB) -> Tuple[int, int, int]:
+    r, g, b = (x / 255 for x in rgb)
+    high, low = max(r, g, b), min(r, g, b)
+    delta = high - low
+    saturation = 0 if high == 0 else delta / high
+    return round(_hue(r, g, b, high, delta)), round(saturation * 100), round(high * 100)
+
+
+def rgb_to_cmyk(rgb: RGB) -> Tuple[int, int, int, int]:
+    r, g, b = (x / 255 for x in rgb)
+    k = 1 - max(r, g, b)
+    if k == 1:
+        return 0, 0, 0, 100
+    c, m, y = ((1 - x - k) / (1 - k) for x in (r, g, b))
+    return round(c * 100), round(m * 100), round(y * 100), round(k * 100)
+
+
+def delinearize(linear: np.ndarray) -> np.ndarray:
+    """Convert linear light in the range 0-1 to sRGB values in the range 0-255."""
+    c = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+    return np.clip(np.round(c * 255), 0, 255).astype(np.uint8)
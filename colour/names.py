@@ -0,0 +1,29 @@
+import json
+import pathlib
+from typing import List, Tuple
+
+import numpy as np
+
+from .conversions import RGB, rgb_to_lab
+
+
+class ColourNames:
+    """A table of named colours, searchable by perceptual distance in CIELAB."""
+
+    def __init__(self, colours: List[Tuple[str, str]]):
+        self.hexes = [h.lower() for h, _ in colours]
+        self.names = [n for _, n in colours]
+        rgb = np.array([[int(h[i : i + 2], 16) for i in (0, 2, 4)] for h in self.hexes])
+        self.lab = rgb_to_lab(rgb)
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path) -> "ColourNames":
+        with path.open(encoding="utf-8") as fp:
+            return cls(json.load(fp)["colours"])
+
+    def nearest(self, rgb: RGB) -> Tuple[str, str, bool]:
+        """Get the closest named colour's hex code and name, and whether it's exact."""
+        distances = np.sum((self.lab - rgb_to_lab(np.array(rgb))) ** 2, axis=1)
+        index = int(np.argmin(distances))
+        hex_code = self.hexes[index]
+        return "#" + hex_code, self.names[index], hex_code == "{:02x}{:02x}{:02x}".format(*rgb)
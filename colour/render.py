@@ -0,0 +1,114 @@
+import functools
+import io
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .conversions import RGB, contrast_colour, delinearize, linearize
+
+CacheKey = Tuple[str, ...]
+
+CACHE_SIZE = 128
+FONT_SIZE = 100
+LABEL_FONT_SIZE = 24
+PADDING = 10
+SWATCH_SIZE = 160
+GRADIENT_WIDTH = 1024
+GRADIENT_HEIGHT = 160
+
+
+@functools.lru_cache(maxsize=None)
+def get_font(size: int = FONT_SIZE) -> ImageFont.FreeTypeFont:
+    return ImageFont.load_default(size=size)  # type: ignore[return-value]
+
+
+def render_name(*, colour: RGB, name: str, contrast: RGB) -> bytes:
+    """Render a colour's name over the colour as PNG bytes.
+
+    This is CPU bound, so should be run in an executor.
+    """
+    font = get_font()
+    left, top, right, bottom = font.getbbox(name)
+    image = Image.new("RGB", (right - left + PADDING * 2, bottom - top + PADDING * 2), colour)
+    ImageDraw.Draw(image).text((PADDING - left, PADDING - top), name, fill=contrast, font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, "png")
+    return buffer.getvalue()
+
+
+def to_png(array: np.ndarray, labels: List[Tuple[float, str]]) -> bytes:
+    """Encode an RGB array as PNG bytes, with labels centred at the given x positions.
+
+    Each label is drawn in black or white, whichever is more readable on the
+    colour beneath it.
+    """
+    image = Image.fromarray(array, "RGB")
+    drawer = ImageDraw.Draw(image)
+    font = get_font(LABEL_FONT_SIZE)
+    height, width = array.shape[:2]
+    for x, text in labels:
+        left, top, right, bottom = font.getbbox(text)
+        x = min(max(x - (right - left) / 2, PADDING), width - (right - left) - PADDING)
+        y = height - (bottom - top) - PADDING
+        below = tuple(int(c) for c in array[height - 1 - PADDING, int(x + (right - left) / 2)])
+        drawer.text((x - left, y - top), text, fill=contrast_colour(below), font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, "png", optimize=True)
+    return buffer.getvalue()
+
+
+def render_palette(colours: List[RGB]) -> bytes:
+    """Render a strip of colour swatches, each labelled with its hex code, as PNG bytes.
+
+    This is CPU bound, so should be run in an executor.
+    """
+    strip = np.repeat(np.array(colours, dtype=np.uint8), SWATCH_SIZE, axis=0)
+    array = np.ascontiguousarray(np.broadcast_to(strip, (SWATCH_SIZE, *strip.shape)))
+    labels = [
+        ((i + 0.5) * SWATCH_SIZE, "#{:02X}{:02X}{:02X}".format(*colour))
+        for i, colour in enumerate(colours)
+    ]
+    return to_png(array, labels)
+
+
+def render_gradient(colours: List[RGB]) -> bytes:
+    """Render a gradient through evenly spaced colour stops as PNG bytes.
+
+    Colours are blended in linear light, which avoids the dark bands that
+    blending the gamma encoded sRGB values gives. Each stop is labelled with
+    its hex code. This is CPU bound, so should be run in an executor.
+    """
+    stops = np.linspace(0, 1, len(colours))
+    positions = np.linspace(0, 1, GRADIENT_WIDTH)
+    linear = linearize(np.array(colours))
+    row = np.stack([np.interp(positions, stops, linear[:, i]) for i in range(3)], axis=-1)
+    strip = delinearize(row)
+    array = np.ascontiguousarray(np.broadcast_to(strip, (GRADIENT_HEIGHT, *strip.shape)))
+    labels = [
+        (stop * (GRADIENT_WIDTH - 1), "#{:02X}{:02X}{:02X}".format(*colour))
+        for stop, colour in zip(stops, colours)
+    ]
+    return to_png(array, labels)
+
+
+class ImageCache:
+    """A least recently used cache of rendered images."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[CacheKey, bytes] = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        if (value := self._data.get(key)) is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: CacheKey, value: bytes) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
@@ -0,0 +1,179 @@
+import asyncio
+import difflib
+import functools
+import json
+import pathlib
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+import bs4
+import pycountry
+
+try:
+    import lxml  # noqa: F401
+except ModuleNotFoundError:
+    HTML_PARSER = "html.parser"
+else:
+    HTML_PARSER = "lxml"
+
+from .menus import alpha_2_to_unicode
+
+COUNTRY_CACHE_TTL = 60 * 60 * 24 * 7
+COUNTRY_CACHE_VERSION = 1
+
+ALIASES = {
+    "america": "us",
+    "britain": "gb",
+    "burma": "mm",
+    "czech republic": "cz",
+    "drc": "cd",
+    "great britain": "gb",
+    "holland": "nl",
+    "ivory coast": "ci",
+    "uae": "ae",
+    "uk": "gb",
+    "usa": "us",
+    "vatican": "va",
+}
+
+# Names which are matched anywhere in the argument
+EXCEPTIONS = {"russia": "ru"}
+
+NON_ALPHANUMERIC_RE = re.compile(r"[^a-z0-9 ]+")
+
+# Only the elements we read from flagpedia pages are built into the tree
+COUNTRY_PAGE_STRAINER = bs4.SoupStrainer(
+    ["p", "ul", "table"], class_=["flag-content", "flag-grid", "table-dl"]
+)
+
+
+def normalize(name: str) -> str:
+    """Normalize a country name for lookups, ignoring case, accents and punctuation."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    name = NON_ALPHANUMERIC_RE.sub(" ", name.lower())
+    name = " ".join(name.split())
+    return name[4:] if name.startswith("the ") else name
+
+
+@functools.lru_cache(maxsize=None)
+def get_country_index() -> Dict[str, str]:
+    """Get a mapping of normalized names, codes and aliases to alpha 2 codes."""
+    index: Dict[str, str] = {}
+    for country in pycountry.countries:
+        alpha_2 = country.alpha_2.lower()  # type: ignore[union-attr]
+        names = [country.name, country.alpha_2, country.alpha_3]  # type: ignore[union-attr]
+        for attr in ("common_name", "official_name"):
+            if name := getattr(country, attr, None):
+                names.append(name)
+        if "," in country.name:  # type: ignore[union-attr]
+            # "Korea, Republic of" -> "Republic of Korea"
+            first, _, rest = country.name.partition(",")  # type: ignore[union-attr]
+            names.append(f"{rest} {first}")
+        for name in names:
+            index.setdefault(normalize(name), alpha_2)
+    index.update(ALIASES)
+    index.update(EXCEPTIONS)
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def get_flag_emojis() -> Dict[str, Tuple[str, str]]:
+    """Get a mapping of alpha 2 codes to country names and their flag emojis."""
+    return {
+        c.alpha_2.lower(): (c.name, alpha_2_to_unicode(c.alpha_2))  # type: ignore[union-attr]
+        for c in pycountry.countries
+    }
+
+
+def lookup_alpha_2(argument: str) -> Optional[str]:
+    """Resolve a country name, code or alias to an alpha 2 code, falling back to fuzzy matching."""
+    index = get_country_index()
+    name = normalize(argument)
+    if alpha_2 := index.get(name):
+        return alpha_2
+    for k, alpha_2 in EXCEPTIONS.items():
+        if k in name:
+            return alpha_2
+    if len(name) > 3 and (matches := difflib.get_close_matches(name, index, n=1, cutoff=0.8)):
+        return index[matches[0]]
+    return None
+
+
+def empty_country_info() -> Dict[str, Any]:
+    return {"description": None, "neighbours": {}, "table": {}}
+
+
+def parse_country_page(text: str) -> Dict[str, Any]:
+    """Parse the description, neighbours and information table from a flagpedia page.
+
+    This is CPU bound, so should be run in an executor.
+    """
+    soup = bs4.BeautifulSoup(text, HTML_PARSER, parse_only=COUNTRY_PAGE_STRAINER)
+    ret = empty_country_info()
+
+    flag_content = soup.find("p", class_="flag-content")
+    if flag_content and flag_content.text:
+        ret["description"] = flag_content.text
+
+    neighbour_list = soup.find("ul", class_="flag-grid")
+    if neighbour_list:
+        for li in neighbour_list.find_all("li"):
+            if li.span and li.span.text and li.img and li.img.get("src"):
+                src = li.img["src"]
+                if isinstance(src, str):
+                    ret["neighbours"][li.span.text] = alpha_2_to_unicode(src[16:-4])
+
+    table = soup.find("table", class_="table-dl")
+    if table and table.tbody:
+        for tr in table.tbody.find_all("tr"):
+            if tr.th and tr.th.text and tr.td and tr.td.text:
+                ret["table"][tr.th.text] = tr.td.text
+
+    return ret
+
+
+class CountryCache:
+    """Parsed flagpedia pages, keyed by alpha 2 code and persisted to the cog's data path."""
+
+    def __init__(self, path: pathlib.Path, *, ttl: float = COUNTRY_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.countries: Dict[str, Dict[str, Any]] = {}
+        # Saves run in threads, and share the same temporary file
+        self.save_lock = asyncio.Lock()
+
+    def get(self, alpha_2: str) -> Optional[Dict[str, Any]]:
+        entry = self.countries.get(alpha_2)
+        if entry is None or entry["fetched_at"] + self.ttl < time.time():
+            return None
+        return entry["info"]
+
+    async def set(self, alpha_2: str, info: Dict[str, Any]) -> None:
+        self.countries[alpha_2] = {"fetched_at": time.time(), "info": info}
+        await self.save()
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self.path.open(encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            json.dump(data, fp, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    async def load(self) -> None:
+        data = await asyncio.to_thread(self._read)
+        if data and data.get("version") == COUNTRY_CACHE_VERSION:
+            self.countries = data["countries"]
+
+    async def save(self) -> None:
+        async with self.save_lock:
+            # Copied, since more countries can be added while the thread is writing
+            data = {"version": COUNTRY_CACHE_VERSION, "countries": dict(self.countries)}
+            await asyncio.to_thread(self._write, data)
@@ -1,8 +1,9 @@
+import asyncio
 import datetime
-from typing import Any, Dict, NoReturn, Optional, Union
+import functools
+from typing import Any, Dict, NoReturn, Optional, Tuple, Union
 
 import aiohttp
-import bs4
 import discord
 import pycountry
 
@@ -14,10 +15,18 @@
 from redbot.core import commands
 from redbot.core.bot import Red
 from redbot.core.commands import BadArgument, Cog, Context, Converter
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.chat_formatting import box, pagify
 from redbot.core.utils.views import SimpleMenu
 
-from .menus import LabelledMenu, alpha_2_to_unicode
+from .countries import (
+    CountryCache,
+    empty_country_info,
+    get_flag_emojis,
+    lookup_alpha_2,
+    parse_country_page,
+)
+from .menus import LabelledMenu
 
 
 def square(t: str) -> str:
@@ -32,7 +41,16 @@ def format_attr(t: str) -> str:
     return t.replace("_", " ").title()
 
 
-EXCEPTIONS = {"russia": "ru"}
+@functools.lru_cache(maxsize=None)
+def get_flag_pages() -> Tuple[str, ...]:
+    """Get the paginated list of all flags and their alpha 2 codes."""
+    message = "\n".join(
+        f":flag_{c.alpha_2.lower()}: `[{c.alpha_2}]` {c.name}"  # type: ignore[union-attr]
+        for c in pycountry.countries
+    )
+    return tuple(pagify(message, page_length=500))
+
+
 IMAGE_BASE = "https://flagpedia.net/data/flags/w580/{}.png"
 INFO_BASE = "https://flagpedia.net/"
 SPECIAL_IMAGES = {
@@ -87,14 +105,10 @@ async def convert(  # type: ignore[override]
                 "image": image,
             }
 
-        obj = get(name=argument) or get(alpha_2=argument)
+        alpha_2 = lookup_alpha_2(argument)
+        obj = get(alpha_2=alpha_2) if alpha_2 else None
         if not obj:
-            for k, v in EXCEPTIONS.items():
-                if k in argument:
-                    obj = get(alpha_2=v)
-                    break
-            if not obj:
-                raise BadArgument("Could not match %r to a country." % argument)
+            raise BadArgument("Could not match %r to a country." % argument)
 
         ret: Dict[str, Union[str, int, Dict[str, str]]] = {
             "Name": obj.name.title(),
@@ -103,41 +117,48 @@ async def convert(  # type: ignore[override]
             "image": IMAGE_BASE.format(obj.alpha_2.lower()),
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(INFO_BASE + obj.alpha_2) as req:
-                text = await req.text("utf-8")
-        soup = bs4.BeautifulSoup(text, "html.parser")
-        flag_content = soup.find("p", class_="flag-content")
-        if flag_content and flag_content.text:
-            ret["description"] = flag_content.text
-
-        neighbours: Dict[str, str] = {}
-        neighbour_list = soup.find("ul", class_="flag-grid")
-        if neighbour_list:
-            for li in neighbour_list.find_all("li"):
-                if li.span and li.span.text and li.img and li.img.get("src"):
-                    src = li.img["src"]
-                    if isinstance(src, str):
-                        neighbours[li.span.text] = alpha_2_to_unicode(src[16:-4])
-        ret["neighbours"] = neighbours
-
-        table = soup.find("table", class_="table-dl")
-        if table and table.tbody:
-            for tr in table.tbody.find_all("tr"):
-                if tr.th and tr.th.text and tr.td and tr.td.text:
-                    ret[tr.th.text] = tr.td.text
+        cog = ctx.bot.get_cog("Flags")
+        if isinstance(cog, Flags):
+            info = await cog.get_country_info(obj.alpha_2)
+        else:
+            async with aiohttp.ClientSession() as session:
+                info = await fetch_country_info(session, obj.alpha_2) or empty_country_info()
+
+        if info["description"]:
+            ret["description"] = info["description"]
+        ret["neighbours"] = dict(info["neighbours"])
+        ret.update(info["table"])
 
         return ret
 
 
+async def fetch_country_info(
+    session: aiohttp.ClientSession, alpha_2: str
+) -> Optional[Dict[str, Any]]:
+    """Fetch and parse a country's flagpedia page, or None if it couldn't be fetched."""
+    async with session.get(INFO_BASE + alpha_2) as req:
+        if req.status != 200:
+            return None
+        text = await req.text("utf-8")
+    return await asyncio.to_thread(parse_country_page, text)
+
+
 class Flags(Cog):
     """Get flags from country names."""
 
-    __version__ = "1.1.6"
+    __version__ = "1.2.0"
     __author__ = "Kreusada"
 
     def __init__(self, bot: Red):
         self.bot = bot
+        self.session = aiohttp.ClientSession()
+        self.country_cache = CountryCache(cog_data_path(self) / "countries.json")
+
+    async def cog_load(self) -> None:
+        await self.country_cache.load()
+
+    async def cog_unload(self) -> None:
+        await self.session.close()
 
     def format_help_for_context(self, ctx: Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -147,6 +168,15 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    async def get_country_info(self, alpha_2: str) -> Dict[str, Any]:
+        if (info := self.country_cache.get(alpha_2)) is not None:
+            return info
+        if (info := await fetch_country_info(self.session, alpha_2)) is None:
+            # Not cached, the page may well be available next time
+            return empty_country_info()
+        await self.country_cache.set(alpha_2, info)
+        return info
+
     @commands.has_permissions(embed_links=True)
     @commands.command()
     async def flag(
@@ -229,50 +259,45 @@ async def flagemojis(
         if not countries:
             return await ctx.send_help()
 
-        # Convert country arguments
-        converter = CountryConverter()
-        converted_countries = []
+        # Resolved locally, this doesn't need the information the converter fetches
+        emojis = get_flag_emojis()
+        lines = []
         for country in countries:
-            try:
-                result = await converter.convert(ctx, country)
-                converted_countries.append(result)
-            except BadArgument as e:
-                await ctx.send(f"Error with {country}: {e}")
+            if (special := SPECIAL_IMAGES.get(country.lower())) is not None:
+                emoji = emojify(special["emoji"])
+                lines.append(f"{emoji} - `{emoji}` ({country.title()})")
+                continue
+            alpha_2 = lookup_alpha_2(country)
+            if alpha_2 is None or alpha_2 not in emojis:
+                await ctx.send(f"Error with {country}: Could not match {country!r} to a country.")
                 return
+            name, emoji = emojis[alpha_2]
+            lines.append(f"{emoji} - `:flag_{alpha_2}:` ({name.title()})")
 
-        message = "\n".join(
-            f"{c['Emoji']} - `{c['Emoji']}` ({c['Name']})" for c in converted_countries
-        )
-        for page in pagify(message):
+        for page in pagify("\n".join(lines)):
             await ctx.send(page)
 
     @commands.has_permissions(embed_links=True)
     @commands.command()
     async def flags(self, ctx: commands.Context, page_number: Optional[int] = None):
         """Get a list of all the flags and their alpha 2 codes."""
-        embeds = []
-        message = "\n".join(
-            f":flag_{c.alpha_2.lower()}: `[{c.alpha_2}]` {c.name}"  # type: ignore[union-attr]
-            for c in pycountry.countries
-        )
-        pages = tuple(pagify(message, page_length=500))
+        pages = get_flag_pages()
         color = await ctx.embed_colour()
-        for page in pages:
-            embed = discord.Embed(
-                title=f"All flags (page {pages.index(page) + 1}/{len(pages)})",
-                description=page,
+
+        def make_embed(index: int) -> discord.Embed:
+            return discord.Embed(
+                title=f"All flags (page {index + 1}/{len(pages)})",
+                description=pages[index],
                 color=color,
             )
-            embeds.append(embed)
+
         if page_number is not None:
-            try:
-                embed = embeds[page_number - 1]
-            except IndexError:
+            if not 1 <= page_number <= len(pages):
                 await ctx.send(
-                    f"Invalid page number provided, must be between 1 and {len(embeds)}."
+                    f"Invalid page number provided, must be between 1 and {len(pages)}."
                 )
                 return
-            else:
-                await ctx.send(embed=embed)
+            await ctx.send(embed=make_embed(page_number - 1))
         else:
+            embeds = [make_embed(i) for i in range(len(pages))]
             await SimpleMenu(embeds, use_select_menu=True).start(ctx)
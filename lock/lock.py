@@ -1,11 +1,22 @@
 import datetime
 import typing
-from typing import Any, NoReturn
+from typing import Any, List, NoReturn, Optional
 
 import discord
 from redbot.core import Config, commands
 from redbot.core.bot import Red
-from redbot.core.utils.chat_formatting import humanize_list
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import humanize_list, humanize_number
+
+from .overwrites import (
+    BulkOverwriteResult,
+    OverwriteEdit,
+    SnapshotStore,
+    apply_overwrites,
+    group_by_category,
+    restore_edits,
+    snapshot_overwrites,
+)
 
 
 class Lock(commands.Cog):
@@ -13,14 +24,15 @@ class Lock(commands.Cog):
     Lock `@everyone` from sending messages in channels or the entire guild, and only allow Moderators to talk.
     """
 
-    __version__ = "2.0.1"
+    __version__ = "2.3.0"
     __author__ = "saurichable, Kreusada"
 
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=36546565165464, force_registration=True)
 
-        self.config.register_guild(moderator=None, everyone=True, ignore=[])
+        self.config.register_guild(moderator=None, everyone=True, ignore=[], categories=False)
+        self.snapshots = SnapshotStore(cog_data_path(self) / "snapshots")
 
     async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
@@ -30,6 +42,48 @@ def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
         return f"{context}\n\nVersion: {self.__version__}\nAuthors : {self.__author__}"
 
+    @staticmethod
+    async def run_bulk_edit(
+        ctx: commands.Context, edits: List[OverwriteEdit], *, action: str
+    ) -> BulkOverwriteResult:
+        message: Optional[discord.Message] = None
+
+        async def progress(done: int, total: int) -> None:
+            nonlocal message
+            content = f"{action} channels... ({humanize_number(done)}/{humanize_number(total)})"
+            try:
+                if message is None:
+                    message = await ctx.send(content)
+                else:
+                    await message.edit(content=content)
+            except discord.HTTPException:
+                pass
+
+        result = await apply_overwrites(
+            edits,
+            reason=f"{action} server requested by {ctx.author} ({ctx.author.id})",
+            progress=progress,
+        )
+        if message is not None:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                pass
+        return result
+
+    @staticmethod
+    def format_result(result: BulkOverwriteResult) -> str:
+        ret = (
+            f"{humanize_number(result.edited)} permission overwrites changed, "
+            f"{humanize_number(result.skipped)} already up to date."
+        )
+        if failed := result.failed_channels:
+            ret += "\nFailed to edit " + humanize_list([c.mention for c in failed[:20]])
+            if len(failed) > 20:
+                ret += f" and {humanize_number(len(failed) - 20)} more"
+            ret += "."
+        return ret
+
     @commands.group(autohelp=True)
     @commands.guild_only()
     @commands.admin()
@@ -48,6 +102,17 @@ async def lockset_perms(self, ctx: commands.Context, everyone: bool):
         await self.config.guild(ctx.guild).everyone.set(not everyone)
         await ctx.tick()
 
+    @lockset.command(name="categories")
+    async def lockset_categories(self, ctx: commands.Context, toggle: bool):
+        """Set if server locks should be applied to categories where possible.
+
+        Channels synced with their category are locked by locking the category,
+        which needs far fewer permission edits. Channels which aren't synced, and
+        categories with ignored channels, are still locked individually.
+        """
+        await self.config.guild(ctx.guild).categories.set(toggle)
+        await ctx.tick()
+
     @lockset.command(name="ignore")
     async def lockset_ignore(self, ctx: commands.Context, channel: discord.TextChannel):
         """Ignore a channel during server lock."""
@@ -99,6 +164,7 @@ async def lockset_settings(self, ctx: commands.Context):
             value=str(not data["everyone"]),
             inline=False,
         )
+        embed.add_field(name="Locking categories:", value=str(data["categories"]), inline=False)
         embed.add_field(name="Ignored channels:", value=c_text, inline=False)
 
         await ctx.send(embed=embed)
@@ -137,22 +203,30 @@ async def lock_server(self, ctx: commands.Context, confirmation: typing.Optional
             mods = ctx.guild.get_role(await self.config.guild(ctx.guild).moderator())
             which = await self.config.guild(ctx.guild).everyone()
             ignore = await self.config.guild(ctx.guild).ignore()
+            categories = await self.config.guild(ctx.guild).categories()
 
             if not mods:
                 return await ctx.send("Uh oh. Looks like your Admins haven't setup this yet.")
-            for channel in ctx.guild.text_channels:
-                if channel.id in ignore:
-                    continue
-                if which:
-                    await channel.set_permissions(
-                        ctx.guild.default_role, read_messages=True, send_messages=False
-                    )
-                else:
-                    await channel.set_permissions(
-                        ctx.guild.default_role, read_messages=False, send_messages=False
-                    )
-                await channel.set_permissions(mods, read_messages=True, send_messages=True)
-        await ctx.send(":lock: Server locked. Only Moderators can type.")
+            everyone = discord.PermissionOverwrite(read_messages=which, send_messages=False)
+            moderators = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            if categories:
+                channels = group_by_category(ctx.guild.text_channels, ignore)
+            else:
+                channels = [c for c in ctx.guild.text_channels if c.id not in ignore]
+
+            # Keep the overwrites from before the first lock if the server is locked again
+            snapshot = snapshot_overwrites(channels, [ctx.guild.default_role, mods])
+            snapshot.update(await self.snapshots.get(ctx.guild.id))
+            await self.snapshots.set(ctx.guild.id, snapshot)
+
+            edits = []
+            for channel in channels:
+                edits.append(OverwriteEdit(channel, ctx.guild.default_role, everyone))
+                edits.append(OverwriteEdit(channel, mods, moderators))
+            result = await self.run_bulk_edit(ctx, edits, action="Locking")
+        await ctx.send(
+            ":lock: Server locked. Only Moderators can type.\n" + self.format_result(result)
+        )
 
     @commands.mod()
     @commands.bot_has_permissions(manage_channels=True)
@@ -185,15 +259,22 @@ async def unlock_server(self, ctx: commands.Context):
 
             if not mods:
                 return await ctx.send("Uh oh. Looks like your Admins haven't setup this yet.")
-            for channel in ctx.guild.text_channels:
-                if channel.id in ignore:
-                    continue
-                if which:
-                    await channel.set_permissions(
-                        ctx.guild.default_role, read_messages=True, send_messages=True
-                    )
-                else:
-                    await channel.set_permissions(
-                        ctx.guild.default_role, read_messages=False, send_messages=True
-                    )
-        await ctx.send(":unlock: Server unlocked.")
+            snapshot = await self.snapshots.get(ctx.guild.id)
+            edits = restore_edits(ctx.guild, snapshot)
+            # Channels locked before snapshots were taken, or created since, are unlocked as before
+            everyone = discord.PermissionOverwrite(read_messages=which, send_messages=True)
+            edits.extend(
+                OverwriteEdit(channel, ctx.guild.default_role, everyone)
+                for channel in ctx.guild.text_channels
+                if channel.id not in ignore and str(channel.id) not in snapshot
+                # Synced channels follow their category when it is restored
+                and not (
+                    channel.permissions_synced
+                    and channel.category is not None
+                    and str(channel.category.id) in snapshot
+                )
+            )
+            result = await self.run_bulk_edit(ctx, edits, action="Unlocking")
+            if not result.failed:
+                await self.snapshots.delete(ctx.guild.id)
+        await ctx.send(":unlock: Server unlocked.\n" + self.format_result(result))
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import pathlib
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import discord
+
+# Permission overwrite edits are rate limited per channel, so edits to different
+# channels can run side by side. This stays well clear of the global rate limit.
+MAX_CONCURRENT_EDITS = 10
+MAX_RETRIES = 3
+PROGRESS_INTERVAL = 3
+
+OverwriteTarget = Union[discord.Role, discord.Member]
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+# channel ID -> target ID -> (allow, deny)
+Snapshot = Dict[str, Dict[str, Tuple[int, int]]]
+
+
+class OverwriteEdit:
+    """A permission overwrite which should be set for a target in a channel."""
+
+    __slots__ = ("channel", "target", "overwrite")
+
+    def __init__(
+        self,
+        channel: discord.abc.GuildChannel,
+        target: OverwriteTarget,
+        overwrite: discord.PermissionOverwrite,
+    ):
+        self.channel = channel
+        self.target = target
+        self.overwrite = overwrite
+
+    def is_applied(self) -> bool:
+        return self.channel.overwrites_for(self.target) == self.overwrite
+
+    async def apply(self, *, reason: Optional[str] = None) -> None:
+        if self.overwrite.is_empty():
+            # An empty overwrite is the same as having none at all
+            await self.channel.set_permissions(self.target, overwrite=None, reason=reason)
+        else:
+            await self.channel.set_permissions(
+                self.target, overwrite=self.overwrite, reason=reason
+            )
+
+
+class BulkOverwriteResult:
+    def __init__(self):
+        self.edited: int = 0
+        self.skipped: int = 0
+        self.failed: List[OverwriteEdit] = []
+
+    @property
+    def failed_channels(self) -> List[discord.abc.GuildChannel]:
+        return list({edit.channel.id: edit.channel for edit in self.failed}.values())
+
+
+async def apply_overwrites(
+    edits: Iterable[OverwriteEdit],
+    *,
+    reason: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    concurrency: int = MAX_CONCURRENT_EDITS,
+) -> BulkOverwriteResult:
+    """Apply many permission overwrite edits concurrently.
+
+    Edits which are already in place are skipped. Edits which are rate limited
+    or hit a server error are retried with backoff, and any which still fail are
+    collected in the result rather than raised.
+
+    ``progress`` is called periodically with the number of finished edits and the
+    total number of edits which needed to be made.
+    """
+    result = BulkOverwriteResult()
+    pending: List[OverwriteEdit] = []
+    for edit in edits:
+        if edit.is_applied():
+            result.skipped += 1
+        else:
+            pending.append(edit)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = 0
+    last_progress = time.monotonic()
+
+    async def run(edit: OverwriteEdit) -> None:
+        nonlocal finished, last_progress
+        async with semaphore:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    await edit.apply(reason=reason)
+                except discord.HTTPException as e:
+                    if (e.status == 429 or e.status >= 500) and attempt < MAX_RETRIES:
+                        await asyncio.sleep(2**attempt + random.random())
+                        continue
+                    result.failed.append(edit)
+                else:
+                    result.edited += 1
+                break
+        finished += 1
+        if progress is not None and time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            await progress(finished, len(pending))
+
+    await asyncio.gather(*map(run, pending))
+    return result
+
+
+def group_by_category(
+    channels: Iterable[discord.TextChannel], ignore: Iterable[int]
+) -> List[discord.abc.GuildChannel]:
+    """Get the channels and categories to edit so that every given channel is covered.
+
+    Channels synced with their category inherit its overwrites, so they are covered
+    by editing the category once. A category is only used when every channel synced
+    with it is a text channel that isn't ignored, otherwise its channels are edited
+    individually.
+    """
+    ignore = set(ignore)
+    to_edit: List[discord.abc.GuildChannel] = []
+    lockable: Dict[int, bool] = {}
+    for channel in channels:
+        if channel.id in ignore:
+            continue
+        category = channel.category
+        if category is None or not channel.permissions_synced:
+            to_edit.append(channel)
+            continue
+        if category.id not in lockable:
+            lockable[category.id] = all(
+                isinstance(c, discord.TextChannel) and c.id not in ignore
+                for c in category.channels
+                if c.permissions_synced
+            )
+            if lockable[category.id]:
+                to_edit.append(category)
+        if not lockable[category.id]:
+            to_edit.append(channel)
+    return to_edit
+
+
+def snapshot_overwrites(
+    channels: Iterable[discord.abc.GuildChannel], targets: Iterable[OverwriteTarget]
+) -> Snapshot:
+    """Record the current overwrites of each target in each channel as allow/deny pairs."""
+    targets = list(targets)
+    snapshot: Snapshot = {}
+    for channel in channels:
+        snapshot[str(channel.id)] = {}
+        for target in targets:
+            allow, deny = channel.overwrites_for(target).pair()
+            snapshot[str(channel.id)][str(target.id)] = (allow.value, deny.value)
+    return snapshot
+
+
+def restore_edits(guild: discord.Guild, snapshot: Snapshot) -> List[OverwriteEdit]:
+    """Get the edits needed to restore a snapshot, ignoring deleted channels and roles."""
+    edits = []
+    for channel_id, overwrites in snapshot.items():
+        if (channel := guild.get_channel(int(channel_id))) is None:
+            continue
+        for target_id, (allow, deny) in overwrites.items():
+            if (target := guild.get_role(int(target_id))) is None:
+                continue
+            overwrite = discord.PermissionOverwrite.from_pair(
+                discord.Permissions(allow), discord.Permissions(deny)
+            )
+            edits.append(OverwriteEdit(channel, target, overwrite))
+    return edits
+
+
+class SnapshotStore:
+    """Snapshots of overwrites taken before locking, stored as one JSON file per guild."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    def _path(self, guild_id: int) -> pathlib.Path:
+        return self.path / f"{guild_id}.json"
+
+    def _read(self, guild_id: int) -> Snapshot:
+        try:
+            with self._path(guild_id).open(encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, guild_id: int, snapshot: Snapshot) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._path(guild_id).open("w", encoding="utf-8") as fp:
+            json.dump(snapshot, fp, separators=(",", ":"))
+
+    def _delete(self, guild_id: int) -> None:
+        self._path(guild_id).unlink(missing_ok=True)
+
+    async def get(self, guild_id: int) -> Snapshot:
+        return await asyncio.to_thread(self._read, guild_id)
+
+    async def set(self, guild_id: int, snapshot: Snapshot) -> None:
+        await asyncio.to_thread(self._write, guild_id, snapshot)
+
+    async def delete(self, guild_id: int) -> None:
+        await asyncio.to_thread(self._delete, guild_id)
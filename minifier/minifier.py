@@ -1,20 +1,108 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
 import io
-from typing import Any, NoReturn
+from collections import OrderedDict
+from typing import Any, Literal, NoReturn, Optional, Tuple
 
 import discord
-import python_minifier as minifier  # type: ignore
 from redbot.core import commands
 from redbot.core.bot import Red
+from redbot.core.commands import FlagConverter
+from redbot.core.utils.chat_formatting import box, humanize_number
+
+from .worker import (
+    JOB_TIMEOUT,
+    JobTimeout,
+    MinifyOptions,
+    MinifyResult,
+    minify_source,
+    new_executor,
+)
+
+MAX_WORKERS = 2
+# How long past its own timeout a job may run before the worker is assumed stuck
+KILL_GRACE = 5
+CACHE_SIZE = 64
+
+
+def format_stats(result: MinifyResult) -> str:
+    def saved(before: int, after: int) -> str:
+        return f"{1 - after / before:.1%}" if before else "0.0%"
+
+    rows = [
+        ("", "Bytes", "Gzipped"),
+        (
+            "Original",
+            humanize_number(result.original_size),
+            humanize_number(result.original_gzip_size),
+        ),
+        (
+            "Minified",
+            humanize_number(result.output_size),
+            humanize_number(result.output_gzip_size),
+        ),
+        (
+            "Saved",
+            saved(result.original_size, result.output_size),
+            saved(result.original_gzip_size, result.output_gzip_size),
+        ),
+    ]
+    return box("\n".join(f"{name:<10} {size:<10} {gzipped}" for name, size, gzipped in rows))
+
+
+class MinifyFlags(FlagConverter):
+    rename_locals: bool = commands.flag(name="rename_locals", default=True)
+    rename_globals: bool = commands.flag(name="rename_globals", default=False)
+    remove_annotations: bool = commands.flag(name="remove_annotations", default=True)
+    hoist_literals: bool = commands.flag(name="hoist_literals", default=True)
+
+    @classmethod
+    async def convert(cls, ctx: commands.Context, argument: str):  # type: ignore[override]
+        try:
+            return await super().convert(ctx, argument)
+        except commands.BadFlagArgument as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"Invalid value for the {e.flag.attribute!r} option, it must be yes or no."
+            )
+        except commands.MissingFlagArgument as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"No value provided for the {e.flag.attribute!r} option."
+            )
+        except commands.TooManyFlags as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"Too many values provided for the {e.flag.attribute!r} option."
+            )
+
+    def to_options(self) -> MinifyOptions:
+        return MinifyOptions(
+            rename_locals=self.rename_locals,
+            rename_globals=self.rename_globals,
+            remove_annotations=self.remove_annotations,
+            hoist_literals=self.hoist_literals,
+        )
 
 
 class Minifier(commands.Cog):
     """Minify your code!"""
 
     __author__ = "Kreusada"
-    __version__ = "0.2.0"
+    __version__ = "0.4.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
+        self.executor = new_executor(MAX_WORKERS)
+        self.cache: OrderedDict[Tuple[str, MinifyOptions], MinifyResult] = OrderedDict()
+
+    async def cog_unload(self) -> None:
+        self.kill_workers(self.executor)
+
+    @staticmethod
+    def kill_workers(executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -24,12 +112,58 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    async def run_minifier(self, source: str, options: MinifyOptions) -> MinifyResult:
+        """Minify source code in a worker process.
+
+        Results are cached, so the same code is only minified once per set of options.
+        Raises ``TimeoutError`` if minifying takes too long.
+        """
+        key = (hashlib.sha256(source.encode("utf-8")).hexdigest(), options)
+        if (result := self.cache.get(key)) is not None:
+            self.cache.move_to_end(key)
+            return result
+
+        executor = self.executor
+        future = asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(minify_source, source, options)
+        )
+        try:
+            result = await asyncio.wait_for(future, JOB_TIMEOUT + KILL_GRACE)
+        except JobTimeout:
+            raise TimeoutError from None
+        except (asyncio.TimeoutError, concurrent.futures.process.BrokenProcessPool) as e:
+            # The worker is stuck or dead, replace the pool unless another job already did
+            if executor is self.executor:
+                self.executor = new_executor(MAX_WORKERS)
+                self.kill_workers(executor)
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError from None
+            raise
+
+        self.cache[key] = result
+        if len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return result
+
     @commands.has_permissions(attach_files=True)
-    @commands.command(usage="<file>")
-    async def minify(self, ctx: commands.Context):
+    @commands.command(usage="<file> [--diff] [options...]")
+    async def minify(
+        self,
+        ctx: commands.Context,
+        diff: Optional[Literal["--diff"]] = None,
+        *,
+        options: MinifyFlags,
+    ):
         """Minify a python file.
 
         You need to attach a file to this command, and it's extension needs to be `.py`.
+        Add `--diff` to get a unified diff of the changes instead of the minified file.
+
+        The following options can be set to yes or no, e.g. `rename_globals: yes`.
+        - `rename_locals` - Shorten the names of local variables (default yes).
+        - `rename_globals` - Shorten the names of global variables (default no).
+        - `remove_annotations` - Remove type annotations (default yes).
+        - `hoist_literals` - Replace repeated strings and bytes with variables (default yes).
         """
         async with ctx.typing():
             if not ctx.message.attachments:
@@ -39,11 +173,29 @@ async def minify(self, ctx: commands.Context):
             if not file_name.endswith((".py", ".python")):
                 return await ctx.send("Must be a python file.")
             try:
-                file = await file.read()
+                source = (await file.read()).decode(encoding="utf-8")
             except UnicodeDecodeError:
                 return await ctx.send("Something went wrong when trying to decode this file.")
-            converted = io.BytesIO(minifier.minify(file).encode(encoding="utf-8"))
+            try:
+                result = await self.run_minifier(source, options.to_options())
+            except TimeoutError:
+                return await ctx.send("This file took too long to minify.")
+            except concurrent.futures.process.BrokenProcessPool:
+                return await ctx.send("The minifier crashed while minifying this file.")
+            stats = format_stats(result)
+            if diff is not None:
+                patch = f"--- a/{file_name}\n+++ b/{file_name}\n{result.diff}\n"
+                if "```" not in patch and len(stats) + len(patch) < 1980:
+                    return await ctx.send(f"{stats}\n{box(patch, lang='diff')}")
+                return await ctx.send(
+                    content=stats,
+                    file=discord.File(
+                        io.BytesIO(patch.encode(encoding="utf-8")),
+                        filename=f"{file_name.rsplit('.', 1)[0]}.diff",
+                    ),
+                )
+            converted = io.BytesIO(result.output.encode(encoding="utf-8"))
             return await ctx.send(
-                content="Please see the attached file below, with your minified code.",
+                content=f"Please see the attached file below, with your minified code.\n{stats}",
                 file=discord.File(converted, filename=file_name),
             )
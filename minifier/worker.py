@@ -0,0 +1,76 @@
+import concurrent.futures
+import difflib
+import gzip
+import multiprocessing
+import pathlib
+import signal
+import site
+from typing import Any, NamedTuple
+
+import python_minifier as minifier  # type: ignore
+
+JOB_TIMEOUT = 10
+
+
+class MinifyOptions(NamedTuple):
+    rename_locals: bool = True
+    rename_globals: bool = False
+    remove_annotations: bool = True
+    hoist_literals: bool = True
+
+
+class MinifyResult(NamedTuple):
+    output: str
+    # A unified diff with no file headers, the cog adds them with the attachment's name
+    diff: str
+    original_size: int
+    output_size: int
+    original_gzip_size: int
+    output_gzip_size: int
+
+
+class JobTimeout(Exception):
+    """Raised inside a worker when minifying takes longer than ``JOB_TIMEOUT``."""
+
+
+def _timed_out(signum: int, frame: Any) -> None:
+    raise JobTimeout
+
+
+def new_executor(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    # Spawned workers can't import this cog unless the directory it was loaded from
+    # is on their path, and forking a running bot isn't safe.
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=site.addsitedir,
+        initargs=(str(pathlib.Path(__file__).parents[1]),),
+    )
+
+
+def minify_source(source: str, options: MinifyOptions) -> MinifyResult:
+    """Minify source code, along with a diff of the changes and the sizes before and after.
+
+    This runs in a worker process. Where timers are available, it's interrupted with
+    ``JobTimeout`` after ``JOB_TIMEOUT`` seconds.
+    """
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _timed_out)
+        signal.setitimer(signal.ITIMER_REAL, JOB_TIMEOUT)
+    try:
+        output = minifier.minify(source, **options._asdict())
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    diff = difflib.unified_diff(source.splitlines(), output.splitlines(), lineterm="")
+    encoded_source, encoded_output = source.encode("utf-8"), output.encode("utf-8")
+    return MinifyResult(
+        output,
+        # Skip the ---/+++ file headers
+        "\n".join(list(diff)[2:]),
+        len(encoded_source),
+        len(encoded_output),
+        len(gzip.compress(encoded_source)),
+        len(gzip.compress(encoded_output)),
+    )
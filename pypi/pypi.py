@@ -1,6 +1,7 @@
+import asyncio
 import io
 import re
-from typing import Any, NoReturn
+from typing import Any, NoReturn, Optional
 
 import aiohttp
 import discord
@@ -12,11 +13,14 @@
     italics,
     pagify,
 )
+from redbot.core.utils.views import SimpleMenu
 
 from .utils import JumpUrlView
 
 URL_RE = re.compile(r"(https?|s?ftp)://(\S+)", re.I)
 GIT_REPO_RE = re.compile("https://github.com/([a-z0-9]+)/([a-z0-9]+)/?$", flags=re.IGNORECASE)
+MAX_CONCURRENT_REQUESTS = 5
+MAX_PROJECTS = 25
 PYTHON_LOGO = "https://upload.wikimedia.org/wikipedia/commons/thumb/c/c3/Python-logo-notext.svg/2048px-Python-logo-notext.svg.png"
 
 
@@ -24,11 +28,12 @@ class PyPi(commands.Cog):
     """Get information about a package available on PyPi."""
 
     __author__ = ["Kreusada", "OofChair"]
-    __version__ = "1.1.1"
+    __version__ = "1.2.0"
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.session = aiohttp.ClientSession()
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -74,6 +79,33 @@ async def make_request(self, url: str) -> dict[str, Any]:
                 raise ValueError
             return await request.json()
 
+    async def make_bounded_request(self, url: str) -> Optional[dict[str, Any]]:
+        async with self.semaphore:
+            try:
+                return await self.make_request(url)
+            except (ValueError, aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+
+    @staticmethod
+    def get_license(info: dict[str, Any]) -> str:
+        license = info["license"] or "UNKNOWN"
+        if license == "UNKNOWN":
+            for c in info["classifiers"]:
+                if "License" in c:
+                    license = c.split("::")[-1].strip()
+                    break
+            if license == "UNKNOWN":
+                #  If it's still unknown
+                license = license.capitalize()
+        return license
+
+    @staticmethod
+    def get_latest_release_date(releases: dict[str, list[dict[str, Any]]]) -> Optional[str]:
+        upload_times = [r[-1]["upload_time"][:10] for r in releases.values() if r]
+        if not upload_times:
+            return None
+        return "-".join(reversed(max(upload_times).split("-")))
+
     @commands.bot_has_permissions(embed_links=True)
     @commands.command()
     async def pypi(self, ctx: commands.Context, project: str):
@@ -100,15 +132,7 @@ async def pypi(self, ctx: commands.Context, project: str):
         if (author := info["author"]) and author != " ":
             embed.add_field(name="Author", value=author)
 
-        license = info["license"] or "UNKNOWN"
-        if license == "UNKNOWN":
-            for c in info["classifiers"]:
-                if "License" in c:
-                    license = c.split("::")[-1].strip()
-                    break
-            if license == "UNKNOWN":
-                #  If it's still unknown
-                license = license.capitalize()
+        license = self.get_license(info)
         if len(license) > 35:
             bytesio = io.BytesIO(license.encode("utf-8"))
             license = "[TRUNCATED] See file attached"
@@ -230,3 +254,75 @@ async def pypi(self, ctx: commands.Context, project: str):
         kwargs["view"] = JumpUrlView(info["package_url"], project_urls=filtered_links)
         proper_kwargs = self.get_send_kwargs(embed, **kwargs)
         await ctx.send(**proper_kwargs)
+
+    @commands.bot_has_permissions(embed_links=True)
+    @commands.command()
+    async def pypicompare(self, ctx: commands.Context, *projects: str):
+        """Compare several projects on PyPi at once.
+
+        Up to 25 projects can be compared, and they are fetched concurrently.
+
+        **Example:**
+        - `[p]pypicompare aiohttp requests httpx`
+        """
+        projects = tuple(dict.fromkeys(p.lower() for p in projects))
+        if not projects:
+            await ctx.send_help()
+            return
+        if len(projects) > MAX_PROJECTS:
+            await ctx.send(f"You can only compare up to {MAX_PROJECTS} projects at once.")
+            return
+
+        async with ctx.typing():
+            requests = await asyncio.gather(
+                *(
+                    self.make_bounded_request(f"https://pypi.org/pypi/{project}/json")
+                    for project in projects
+                )
+            )
+
+        rows: list[str] = []
+        missing: list[str] = []
+        for project, request in zip(projects, requests):
+            if request is None:
+                missing.append(project)
+                continue
+            info = request["info"]
+            license = self.get_license(info)
+            if len(license) > 35:
+                license = license[:32] + "..."
+            rows.append(
+                f"[{info['name']}]\n"
+                f"Latest Version  : {info['version']}\n"
+                f"Requires Python : {info['requires_python'] or 'Unknown'}\n"
+                f"License         : {license}\n"
+                f"Last Release    : {self.get_latest_release_date(request['releases']) or 'Unknown'}"
+            )
+
+        if not rows:
+            embed = discord.Embed(
+                description=f"There were no results for {humanize_list(list(map(inline, missing)))}."
+            )
+            await ctx.send(**self.get_send_kwargs(embed))
+            return
+
+        pages = list(pagify("\n\n".join(rows), delims=["\n\n"], page_length=1000))
+        embeds: list[discord.Embed] = []
+        for index, page in enumerate(pages, start=1):
+            embed = discord.Embed(
+                title=f"Comparing {len(rows)} projects",
+                description=box(page.strip(), lang="ini"),
+            )
+            if missing:
+                embed.add_field(
+                    name="No results",
+                    value=humanize_list(list(map(inline, missing)))[:1024],
+                    inline=False,
+                )
+            embed.set_footer(text=f"Page {index}/{len(pages)}")
+            embeds.append(self.get_send_kwargs(embed)["embed"])
+
+        if len(embeds) == 1:
+            await ctx.send(embed=embeds[0])
+        else:
+            await SimpleMenu(embeds, use_select_menu=True).start(ctx)  # type: ignore[arg-type]
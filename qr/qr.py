@@ -1,22 +1,46 @@
 import asyncio
+import concurrent.futures
 import inspect
 import io
 import json
 import operator
 import pathlib
 import random
-from typing import Any, Literal, NoReturn, TypeVar
+import zipfile
+from typing import Any, Literal, NoReturn, Optional, TypeVar
 
 import discord
-import qrcode
 from qrcode.exceptions import DataOverflowError
-from qrcode.image import styledpil, styles
 from redbot.core import commands
 from redbot.core.bot import Red
+from redbot.core.commands import FlagConverter
+from redbot.core.utils.chat_formatting import humanize_number
 from redbot.core.utils.predicates import MessagePredicate
 
+from .render import (
+    DEFAULT_BORDER,
+    DEFAULT_BOX_SIZE,
+    DRAWERS,
+    MASKS,
+    RGB,
+    SVG_DRAWERS,
+    OutputFormat,
+    QRCache,
+)
+from .worker import WorkerPool
+
 BotT = TypeVar("BotT", bound=Red)
 
+MAX_TEXT_LENGTH = 250
+MAX_BATCH_SIZE = 100
+MAX_WORKERS = 2
+# Batches get their own workers, so they don't hold up single QR codes
+BATCH_WORKERS = 2
+MAX_BOX_SIZE = 40
+# Styled PNGs are drawn module by module, which gets slow quickly as boxes get bigger
+MAX_STYLED_BOX_SIZE = 15
+MAX_BORDER = 20
+
 _EXCLUDED_COLOURS = (
     # These colors are excluded from showing as examples,
     # but they may still be used in the generation of
@@ -70,6 +94,20 @@
 **Send your message as the corresponding number**
 """.strip()
 
+DEFAULT_SVG_DRAWER_MESSAGE = """
+Please provide a number from 1 to 3 based on the style you'd like.
+If you want the 'classic' QR code style, `1` is the option you'd want to go for.
+
+Fear not, none of these styles will prevent the QR code from working.
+Only these styles are available for SVGs, which don't support colour masks either.
+
+`1:` Squares (most common)
+`2:` Gapped Squares
+`3:` Circled
+
+**Send your message as the corresponding number**
+""".strip()
+
 DEFAULT_MASK_MESSAGE = """
 Please also provide a number from 1 to 5 based on the color mask you'd like.
 If you want the 'classic' QR code style, `1` is the option you'd want to go for.
@@ -83,6 +121,10 @@
 **Send your message as the corresponding number**
 """.strip()
 
+STYLED_BOX_SIZE_MESSAGE = (
+    f"PNGs with a drawer or mask can only have a box size of up to {MAX_STYLED_BOX_SIZE}."
+)
+
 DEFAULT_COLOR_MESSAGE_HEADER = "Please provide a **{0}** colour.\n"
 
 
@@ -124,31 +166,112 @@ async def convert(self, ctx: commands.Context[BotT], argument: str) -> discord.C
             return original_arg
 
 
+class QRStyleFlags(FlagConverter):
+    fill: Optional[discord.Colour] = commands.flag(
+        name="fill", default=None, converter=ColourConverter
+    )
+    back: Optional[discord.Colour] = commands.flag(
+        name="back", aliases=["background"], default=None, converter=ColourConverter
+    )
+    drawer: Optional[int] = commands.flag(name="drawer", default=None)
+    mask: Optional[int] = commands.flag(name="mask", default=None)
+    output: str = commands.flag(name="format", default="png", converter=str.lower)
+    box_size: int = commands.flag(name="box_size", aliases=["size"], default=DEFAULT_BOX_SIZE)
+    border: int = commands.flag(name="border", default=DEFAULT_BORDER)
+
+    @classmethod
+    async def convert(cls, ctx: commands.Context, argument: str):  # type: ignore[override]
+        try:
+            ret = await super().convert(ctx, argument)
+        except commands.BadFlagArgument as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"Invalid value for the {e.flag.attribute!r} option."
+            )
+        except commands.MissingFlagArgument as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"No value provided for the {e.flag.attribute!r} option."
+            )
+        except commands.TooManyFlags as e:
+            raise commands.UserFeedbackCheckFailure(
+                f"Too many values provided for the {e.flag.attribute!r} option."
+            )
+        if ret.drawer is not None and ret.drawer not in DRAWERS:
+            raise commands.UserFeedbackCheckFailure(
+                f"The drawer must be a number from 1 to {len(DRAWERS)}."
+            )
+        if ret.mask is not None and ret.mask not in MASKS:
+            raise commands.UserFeedbackCheckFailure(
+                f"The mask must be a number from 1 to {len(MASKS)}."
+            )
+        if ret.output not in ("png", "svg"):
+            raise commands.UserFeedbackCheckFailure("The format must be either png or svg.")
+        if ret.output == "svg" and ret.drawer is not None and ret.drawer not in SVG_DRAWERS:
+            raise commands.UserFeedbackCheckFailure(
+                f"Only drawers 1 to {len(SVG_DRAWERS)} can be used with the svg format."
+            )
+        if ret.output == "svg" and ret.mask is not None:
+            raise commands.UserFeedbackCheckFailure("Masks can't be used with the svg format.")
+        if not 1 <= ret.box_size <= MAX_BOX_SIZE:
+            raise commands.UserFeedbackCheckFailure(
+                f"The box size must be a number from 1 to {MAX_BOX_SIZE}."
+            )
+        if ret.output == "png" and ret.box_size > MAX_STYLED_BOX_SIZE and ret.has_pattern():
+            raise commands.UserFeedbackCheckFailure(STYLED_BOX_SIZE_MESSAGE)
+        if not 0 <= ret.border <= MAX_BORDER:
+            raise commands.UserFeedbackCheckFailure(
+                f"The border must be a number from 0 to {MAX_BORDER}."
+            )
+        return ret
+
+    def has_pattern(self) -> bool:
+        return self.drawer is not None or self.mask is not None
+
+    def is_styled(self) -> bool:
+        return any(getattr(self, attr) is not None for attr in ("fill", "back", "drawer", "mask"))
+
+    def to_kwargs(self) -> dict[str, Any]:
+        return {
+            "fill": self.fill.to_rgb() if self.fill is not None else None,
+            "back": self.back.to_rgb() if self.back is not None else None,
+            "drawer": self.drawer,
+            "mask": self.mask,
+            **self.output_kwargs(),
+        }
+
+    def output_kwargs(self) -> dict[str, Any]:
+        return {"output": self.output, "box_size": self.box_size, "border": self.border}
+
+
+class QRFlags(QRStyleFlags):
+    text: str = commands.flag(name="text", default="", positional=True)
+
+    @classmethod
+    async def convert(cls, ctx: commands.Context, argument: str):  # type: ignore[override]
+        # Flags are matched anywhere in the argument, so text such as "Come back: 5pm" would
+        # be misread as options. Options are only parsed when the argument starts with one.
+        names = [*cls.get_flags(), *cls.__commands_flag_aliases__]
+        if argument.lstrip().startswith(tuple(f"{name}:" for name in names)):
+            return await super().convert(ctx, argument)
+        ret = await super().convert(ctx, "")
+        ret.text = argument
+        return ret
+
+
 class QR(commands.Cog):
     """Generate a QR code."""
 
     __author__ = "Kreusada"
-    __version__ = "1.2.0"
+    __version__ = "1.3.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
-        self.styles = {
-            "drawers": {
-                1: styles.moduledrawers.SquareModuleDrawer(),  # type: ignore[attr-defined]
-                2: styles.moduledrawers.GappedSquareModuleDrawer(),  # type: ignore[attr-defined]
-                3: styles.moduledrawers.CircleModuleDrawer(),  # type: ignore[attr-defined]
-                4: styles.moduledrawers.RoundedModuleDrawer(),  # type: ignore[attr-defined]
-                5: styles.moduledrawers.VerticalBarsDrawer(),  # type: ignore[attr-defined]
-                6: styles.moduledrawers.HorizontalBarsDrawer(),  # type: ignore[attr-defined]
-            },
-            "masks": {
-                1: styles.colormasks.SolidFillColorMask(),  # type: ignore[attr-defined]
-                2: styles.colormasks.RadialGradiantColorMask(),  # type: ignore[attr-defined]
-                3: styles.colormasks.SquareGradiantColorMask(),  # type: ignore[attr-defined]
-                4: styles.colormasks.HorizontalGradiantColorMask(),  # type: ignore[attr-defined]
-                5: styles.colormasks.VerticalGradiantColorMask(),  # type: ignore[attr-defined]
-            },
-        }
+        self.cache = QRCache()
+        self.pool = WorkerPool(MAX_WORKERS)
+        self.batch_pool = WorkerPool(BATCH_WORKERS)
+
+    async def cog_unload(self) -> None:
+        self.pool.shutdown()
+        self.batch_pool.shutdown()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -158,6 +281,41 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    async def generate(
+        self,
+        text: str,
+        *,
+        fill: Optional[RGB] = None,
+        back: Optional[RGB] = None,
+        drawer: Optional[int] = None,
+        mask: Optional[int] = None,
+        output: OutputFormat = "png",
+        box_size: int = DEFAULT_BOX_SIZE,
+        border: int = DEFAULT_BORDER,
+        pool: Optional[WorkerPool] = None,
+    ) -> bytes:
+        """Render a QR code in a worker process, or get it from the cache.
+
+        Raises ``TimeoutError`` if rendering takes too long.
+        """
+        key = (text, fill, back, drawer, mask, output, box_size, border)
+        if (cached := self.cache.get(key)) is not None:
+            return cached
+        data = await (pool or self.pool).render(
+            text,
+            {
+                "fill": fill,
+                "back": back,
+                "drawer": drawer,
+                "mask": mask,
+                "output": output,
+                "box_size": box_size,
+                "border": border,
+            },
+        )
+        self.cache.set(key, data)
+        return data
+
     async def convert_colour(self, ctx: commands.Context, content: str) -> discord.Colour | str:
         colour_converter = ColourConverter()
         ret: discord.Colour | str
@@ -169,7 +327,7 @@ async def convert_colour(self, ctx: commands.Context, content: str) -> discord.C
 
     async def get_colour_data(
         self, ctx: commands.Context, shade: Literal["background", "fill"]
-    ) -> dict[str, tuple[int, int, int]] | Literal[False]:
+    ) -> dict[str, RGB] | Literal[False]:
         def check(x: discord.Message) -> bool:
             return all(operator.eq(getattr(ctx, y), getattr(x, y)) for y in ("author", "channel"))
 
@@ -187,17 +345,23 @@ def check(x: discord.Message) -> bool:
                 await ctx.send(color)
                 return False
 
-            return {f"{shade[:4]}_color": color.to_rgb()}
+            return {shade[:4]: color.to_rgb()}
 
     async def get_style_data(
-        self, ctx: commands.Context, style_type: Literal["drawers", "masks"]
+        self,
+        ctx: commands.Context,
+        style_type: Literal["drawers", "masks"],
+        output: OutputFormat = "png",
     ) -> dict[str, Any] | Literal[False]:
         mapper = {
             "drawers": {
-                "message": DEFAULT_DRAWER_MESSAGE,
-                "kwarg_key": "module_drawer",
+                "message": (
+                    DEFAULT_SVG_DRAWER_MESSAGE if output == "svg" else DEFAULT_DRAWER_MESSAGE
+                ),
+                "kwarg_key": "drawer",
+                "styles": SVG_DRAWERS if output == "svg" else DRAWERS,
             },
-            "masks": {"message": DEFAULT_MASK_MESSAGE, "kwarg_key": "color_mask"},
+            "masks": {"message": DEFAULT_MASK_MESSAGE, "kwarg_key": "mask", "styles": MASKS},
         }
 
         def pred(x: int) -> Any:
@@ -205,29 +369,17 @@ def pred(x: int) -> Any:
 
         await ctx.maybe_send_embed(mapper[style_type]["message"])
         try:
-            check = pred(len(self.styles[style_type]))
+            check = pred(len(mapper[style_type]["styles"]))
             message = await self.bot.wait_for("message", check=check, timeout=100)
         except asyncio.TimeoutError:
             await ctx.send("You took too long to respond, please start over.")
             return False
         else:
-            return {mapper[style_type]["kwarg_key"]: self.styles[style_type][int(message.content)]}
-
-    @commands.bot_has_permissions(embed_links=True)
-    @commands.command()
-    async def qr(self, ctx: commands.Context, *, text: str):
-        """Create a QR code from text.
-
-        When you scan this QR code, it will take you to google with the text query,
-        or the website if you provide a website. That's essentially how QR codes work.
-        """
-        if len(text) > 250:
-            await ctx.send("Please provide a sensible number of characters.")
-            return
-
-        qrc = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)  # type: ignore[attr-defined]
-        qrc.add_data(text)
+            return {mapper[style_type]["kwarg_key"]: int(message.content)}
 
+    async def prompt_options(
+        self, ctx: commands.Context, text: str, output: OutputFormat = "png"
+    ) -> Optional[tuple[dict[str, Any], dict[str, Any]]]:
         def pred(x: int) -> Any:
             return MessagePredicate.contained_in(list(map(str, range(1, x + 1))))
 
@@ -237,7 +389,7 @@ def pred(x: int) -> Any:
             result = await self.bot.wait_for("message", check=pred(3), timeout=100)
         except asyncio.TimeoutError:
             await ctx.send("You took too long to respond, please start over.")
-            return
+            return None
         else:
             result_num = int(result.content)
             qrc_kwargs: dict[str, Any] = {}
@@ -247,42 +399,171 @@ def pred(x: int) -> Any:
                 for shade in ("background", "fill"):
                     update = await self.get_colour_data(ctx, shade)  # type: ignore[arg-type]
                     if update is False:
-                        return
+                        return None
                     if shade == "background":
-                        embed_kwargs["colour"] = discord.Colour.from_rgb(*update["back_color"])
+                        embed_kwargs["colour"] = discord.Colour.from_rgb(*update["back"])
                     qrc_kwargs.update(update)
 
             if result_num == 2:
-                qrc_kwargs["image_factory"] = styledpil.StyledPilImage
-                for style_type in ("drawers", "masks"):
-                    update = await self.get_style_data(ctx, style_type)  # type: ignore[arg-type]
+                # SVGs don't support colour masks
+                style_types = ("drawers",) if output == "svg" else ("drawers", "masks")
+                for style_type in style_types:
+                    update = await self.get_style_data(
+                        ctx, style_type, output  # type: ignore[arg-type]
+                    )
                     if update is False:
-                        return
+                        return None
                     qrc_kwargs.update(update)
 
+        return qrc_kwargs, embed_kwargs
+
+    @commands.bot_has_permissions(embed_links=True)
+    @commands.group(invoke_without_command=True)
+    async def qr(self, ctx: commands.Context, *, options: QRFlags):
+        """Create a QR code from text.
+
+        When you scan this QR code, it will take you to google with the text query,
+        or the website if you provide a website. That's essentially how QR codes work.
+
+        The QR code can be customized straight away by providing any of the
+        following options, otherwise you'll be asked how you'd like it to look.
+        Options are only read when your message starts with one, such as `text:`.
+
+        - `fill:` The colour of the QR code.
+        - `back:` The background colour of the QR code.
+        - `drawer:` The pattern of the QR code, from 1 to 6.
+        - `mask:` The colour mask of the QR code, from 1 to 5.
+
+        With a gradient mask, the gradient starts from the fill colour.
+
+        The output can also be changed with these options, which don't skip the prompts.
+        - `format:` Either `png` (the default) or `svg`. SVGs support drawers 1 to 3, but no masks.
+        - `size:` The size of each box of the QR code in pixels, defaults to 10.
+        This can be up to 40, or up to 15 for PNGs with a drawer or mask.
+        - `border:` The size of the border in boxes, defaults to 4.
+
+        **Examples:**
+        - `[p]qr https://discord.com`
+        - `[p]qr text: https://discord.com fill: #000000 back: #ffffff`
+        - `[p]qr text: https://discord.com drawer: 3 mask: 2`
+        - `[p]qr text: https://discord.com format: svg`
+        """
+        text = options.text.strip()
+        if not text:
+            await ctx.send_help()
+            return
+        if len(text) > MAX_TEXT_LENGTH:
+            await ctx.send("Please provide a sensible number of characters.")
+            return
+
+        if options.is_styled():
+            qrc_kwargs = options.to_kwargs()
+            embed_kwargs: dict[str, Any] = {"colour": options.back or discord.Colour(16777215)}
+        else:
+            prompted = await self.prompt_options(
+                ctx, text, options.output  # type: ignore[arg-type]
+            )
+            if prompted is None:
+                return
+            qrc_kwargs, embed_kwargs = prompted
+            if options.output == "png" and options.box_size > MAX_STYLED_BOX_SIZE:
+                if qrc_kwargs.get("drawer") is not None or qrc_kwargs.get("mask") is not None:
+                    await ctx.send(STYLED_BOX_SIZE_MESSAGE)
+                    return
+            qrc_kwargs.update(options.output_kwargs())
+        filename = f"qr.{options.output}"
+
         confirmation_message = await ctx.maybe_send_embed("Generating QR code...")
         async with ctx.typing():
-            await asyncio.sleep(1)
             sender_kwargs: dict[str, Any] = {}
 
             try:
-                qrc_image = qrc.make_image(**qrc_kwargs)
+                data = await self.generate(text, **qrc_kwargs)
             except DataOverflowError:
                 sender_kwargs["content"] = "Failed to create a QR code for this text."
+            except TimeoutError:
+                sender_kwargs["content"] = "Creating this QR code took too long."
+            except concurrent.futures.process.BrokenProcessPool:
+                sender_kwargs["content"] = "The QR code generator crashed, please try again."
             else:
-                buff = io.BytesIO()
-                qrc_image.save(buff, "png")
-                buff.seek(0)
+                buff = io.BytesIO(data)
                 if await ctx.embed_requested():
                     embed = discord.Embed(**embed_kwargs)
-                    embed.set_image(url="attachment://qr.png")
+                    if options.output == "png":
+                        # Discord can't preview SVGs, so they're only attached
+                        embed.set_image(url=f"attachment://{filename}")
                     embed.set_author(name="Generated QR code")
                     embed.add_field(name="Content", value=text)
                     sender_kwargs["embed"] = embed
-                sender_kwargs["file"] = discord.File(buff, filename="qr.png")
+                sender_kwargs["file"] = discord.File(buff, filename=filename)
             finally:
                 try:
                     await confirmation_message.edit(**sender_kwargs)
                 except (discord.HTTPException, TypeError):
                     # TypeError raised because of nonjsonserializable discord.File object
                     await ctx.send(**sender_kwargs)
+
+    @commands.bot_has_permissions(attach_files=True)
+    @qr.command(name="batch")
+    async def qr_batch(self, ctx: commands.Context, *, options: QRStyleFlags):
+        """Create QR codes for every line of an attached text file.
+
+        The QR codes are sent back in a zip file. The same options as `[p]qr`
+        can be provided to style every QR code.
+
+        **Examples:**
+        - `[p]qr batch` (with a text file attached)
+        - `[p]qr batch fill: #000000 back: #ffffff`
+        """
+        if not ctx.message.attachments:
+            await ctx.send("Please attach a text file with one QR code's text per line.")
+            return
+        try:
+            content = (await ctx.message.attachments[0].read()).decode("utf-8")
+        except UnicodeDecodeError:
+            await ctx.send("The attached file must be a UTF-8 text file.")
+            return
+
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        if not lines:
+            await ctx.send("The attached file doesn't have any text in it.")
+            return
+        if len(lines) > MAX_BATCH_SIZE:
+            await ctx.send(f"Please provide at most {MAX_BATCH_SIZE} lines.")
+            return
+        if any(len(line) > MAX_TEXT_LENGTH for line in lines):
+            await ctx.send(f"Each line must be at most {MAX_TEXT_LENGTH} characters long.")
+            return
+
+        async with ctx.typing():
+            qrc_kwargs = options.to_kwargs()
+            results = await asyncio.gather(
+                *(self.generate(line, **qrc_kwargs, pool=self.batch_pool) for line in lines),
+                return_exceptions=True,
+            )
+            if any(isinstance(r, concurrent.futures.process.BrokenProcessPool) for r in results):
+                await ctx.send("The QR code generator crashed, please try again.")
+                return
+
+            buff = io.BytesIO()
+            failed = []
+            # PNGs are already compressed, so they're stored as they are
+            compression = zipfile.ZIP_DEFLATED if options.output == "svg" else zipfile.ZIP_STORED
+            with zipfile.ZipFile(buff, "w", compression=compression) as zf:
+                index = []
+                for number, (line, data) in enumerate(zip(lines, results), start=1):
+                    if isinstance(data, (DataOverflowError, TimeoutError)):
+                        failed.append(number)
+                        continue
+                    if isinstance(data, BaseException):
+                        raise data
+                    filename = f"qr_{number:03}.{options.output}"
+                    zf.writestr(filename, data)
+                    index.append(f"{filename}\t{line}")
+                zf.writestr("index.txt", "\n".join(index), compress_type=zipfile.ZIP_DEFLATED)
+
+        message = f"Generated {humanize_number(len(lines) - len(failed))} QR codes."
+        if failed:
+            message += f"\nFailed to create QR codes for lines {', '.join(map(str, failed))}."
+        buff.seek(0)
+        await ctx.send(message, file=discord.File(buff, filename="qr_codes.zip"))
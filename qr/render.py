@@ -0,0 +1,142 @@
+import io
+from collections import OrderedDict
+from typing import Any, Literal, Optional, Tuple
+
+import qrcode
+from PIL import Image
+from qrcode.image import styledpil, styles, svg
+
+RGB = Tuple[int, int, int]
+OutputFormat = Literal["png", "svg"]
+CacheKey = Tuple[
+    str, Optional[RGB], Optional[RGB], Optional[int], Optional[int], OutputFormat, int, int
+]
+
+CACHE_SIZE = 128
+DEFAULT_BOX_SIZE = 10
+DEFAULT_BORDER = 4
+
+# Drawers and masks keep per image state, so a new one is created for every render
+DRAWERS = {
+    1: styles.moduledrawers.SquareModuleDrawer,  # type: ignore[attr-defined]
+    2: styles.moduledrawers.GappedSquareModuleDrawer,  # type: ignore[attr-defined]
+    3: styles.moduledrawers.CircleModuleDrawer,  # type: ignore[attr-defined]
+    4: styles.moduledrawers.RoundedModuleDrawer,  # type: ignore[attr-defined]
+    5: styles.moduledrawers.VerticalBarsDrawer,  # type: ignore[attr-defined]
+    6: styles.moduledrawers.HorizontalBarsDrawer,  # type: ignore[attr-defined]
+}
+# Each mask with the argument the fill colour is given as, gradients start from the fill
+# colour and end in the mask's own second colour
+MASKS = {
+    1: (styles.colormasks.SolidFillColorMask, "front_color"),  # type: ignore[attr-defined]
+    2: (styles.colormasks.RadialGradiantColorMask, "center_color"),  # type: ignore[attr-defined]
+    3: (styles.colormasks.SquareGradiantColorMask, "center_color"),  # type: ignore[attr-defined]
+    4: (
+        styles.colormasks.HorizontalGradiantColorMask,  # type: ignore[attr-defined]
+        "left_color",
+    ),
+    5: (styles.colormasks.VerticalGradiantColorMask, "top_color"),  # type: ignore[attr-defined]
+}
+# The styled drawers which have an SVG equivalent, SVGs don't support colour masks
+SVG_DRAWERS = {
+    1: None,
+    2: "gapped-square",
+    3: "circle",
+}
+
+
+def to_hex(colour: RGB) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*colour)
+
+
+def render_svg(
+    qrc: qrcode.QRCode, *, fill: Optional[RGB], back: Optional[RGB], drawer: Optional[int]
+) -> bytes:
+    attrs: dict[str, Any] = {"background": to_hex(back) if back is not None else "white"}
+    if fill is not None:
+        attrs["QR_PATH_STYLE"] = {**svg.SvgPathImage.QR_PATH_STYLE, "fill": to_hex(fill)}
+    factory = type("QRSvgImage", (svg.SvgPathImage,), attrs)
+    kwargs: dict[str, Any] = {"image_factory": factory}
+    if (alias := SVG_DRAWERS[drawer or 1]) is not None:
+        kwargs["module_drawer"] = alias
+    buff = io.BytesIO()
+    qrc.make_image(**kwargs).save(buff)
+    return buff.getvalue()
+
+
+def render_plain_png(qrc: qrcode.QRCode, *, fill: Optional[RGB], back: Optional[RGB]) -> bytes:
+    kwargs: dict[str, Any] = {}
+    if fill is not None:
+        kwargs["fill_color"] = fill
+    if back is not None:
+        kwargs["back_color"] = back
+    image = qrc.make_image(**kwargs).get_image()
+    if image.mode != "1":
+        # Custom colours are drawn in RGB, but a two colour palette is all that's needed
+        image = image.convert("P", palette=Image.Palette.ADAPTIVE, colors=2)
+    buff = io.BytesIO()
+    image.save(buff, "png", optimize=True, bits=1)
+    return buff.getvalue()
+
+
+def render_qr(
+    text: str,
+    *,
+    fill: Optional[RGB] = None,
+    back: Optional[RGB] = None,
+    drawer: Optional[int] = None,
+    mask: Optional[int] = None,
+    output: OutputFormat = "png",
+    box_size: int = DEFAULT_BOX_SIZE,
+    border: int = DEFAULT_BORDER,
+) -> bytes:
+    """Render a QR code as PNG or SVG bytes.
+
+    This is CPU bound, so should be run in an executor.
+    Raises ``qrcode.exceptions.DataOverflowError`` if the text doesn't fit in a QR code.
+    """
+    qrc = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,  # type: ignore[attr-defined]
+        box_size=box_size,
+        border=border,
+    )
+    qrc.add_data(text)
+
+    if output == "svg":
+        return render_svg(qrc, fill=fill, back=back, drawer=drawer)
+    if drawer is None and mask is None:
+        return render_plain_png(qrc, fill=fill, back=back)
+
+    mask_factory, fill_kwarg = MASKS[mask or 1]
+    mask_kwargs: dict[str, Any] = {}
+    if fill is not None:
+        mask_kwargs[fill_kwarg] = fill
+    if back is not None:
+        mask_kwargs["back_color"] = back
+    image = qrc.make_image(
+        image_factory=styledpil.StyledPilImage,
+        module_drawer=DRAWERS[drawer or 1](),
+        color_mask=mask_factory(**mask_kwargs),
+    )
+    buff = io.BytesIO()
+    image.save(buff, "png")
+    return buff.getvalue()
+
+
+class QRCache:
+    """A least recently used cache of rendered QR codes."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[CacheKey, bytes] = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        if (value := self._data.get(key)) is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: CacheKey, value: bytes) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
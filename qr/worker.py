@@ -0,0 +1,95 @@
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import pathlib
+import signal
+import site
+from typing import Any
+
+from .render import render_qr
+
+JOB_TIMEOUT = 10
+# If a job overruns without the worker interrupting it, the pool is replaced after this long
+KILL_GRACE = 5
+
+
+class JobTimeout(Exception):
+    """Raised inside a worker when a render takes longer than ``JOB_TIMEOUT``."""
+
+
+def _timed_out(signum: int, frame: Any) -> None:
+    raise JobTimeout
+
+
+def render_job(text: str, kwargs: dict[str, Any]) -> bytes:
+    """Render a QR code with ``render_qr``.
+
+    This runs in a worker process. Where timers are available, it's interrupted with
+    ``JobTimeout`` after ``JOB_TIMEOUT`` seconds.
+    """
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _timed_out)
+        signal.setitimer(signal.ITIMER_REAL, JOB_TIMEOUT)
+    try:
+        return render_qr(text, **kwargs)
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class WorkerPool:
+    """A process pool for rendering, which replaces its workers when a render overruns."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        # Jobs only start their timeout once a worker is free to take them
+        self.slots = asyncio.Semaphore(max_workers)
+        self.executor = self._new_executor()
+
+    def _new_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        # Forking a running bot isn't safe, and spawned workers can't import this cog
+        # unless the directory it was loaded from is on their path.
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=site.addsitedir,
+            initargs=(str(pathlib.Path(__file__).parents[1]),),
+        )
+
+    @staticmethod
+    def _terminate(executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def restart(self, executor: concurrent.futures.ProcessPoolExecutor) -> None:
+        # Jobs which were running alongside a broken one fail too, only replace the pool once
+        if executor is self.executor:
+            self.executor = self._new_executor()
+            self._terminate(executor)
+
+    async def render(self, text: str, kwargs: dict[str, Any]) -> bytes:
+        """Render a QR code in a worker process.
+
+        Raises ``TimeoutError`` if it takes longer than ``JOB_TIMEOUT`` seconds.
+        """
+        async with self.slots:
+            executor = self.executor
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(render_job, text, kwargs)
+            )
+            try:
+                return await asyncio.wait_for(future, JOB_TIMEOUT + KILL_GRACE)
+            except JobTimeout:
+                # The worker interrupted itself, so it's still usable
+                raise TimeoutError from None
+            except asyncio.TimeoutError:
+                self.restart(executor)
+                raise TimeoutError from None
+            except concurrent.futures.process.BrokenProcessPool:
+                self.restart(executor)
+                raise
+
+    def shutdown(self) -> None:
+        self._terminate(self.executor)
@@ -1,22 +1,43 @@
-from typing import Any, NoReturn
+import asyncio
+import collections
+import random
+from typing import Any, Deque, Dict, NoReturn, Optional, Tuple
 
 import aiohttp
 from redbot.core import commands
 from redbot.core.bot import Red
 
+Quote = Tuple[str, str]
+
+BUFFER_SIZE = 100
+LOW_WATER_MARK = 20
+RECENT_QUOTES_PER_CHANNEL = 50
+BACKOFF_BASE = 5
+BACKOFF_MAX = 300
+RATE_LIMIT_AUTHOR = "zenquotes.io"
+
 
 class Quotes(commands.Cog):
     """Get a random quote."""
 
-    __version__ = "1.3.1"
+    __version__ = "1.4.0"
     __author__ = "Kreusada"
 
     def __init__(self, bot: Red):
         self.bot = bot
-        self.api = "https://zenquotes.io/api/random"
+        self.api = "https://zenquotes.io/api/quotes"
         self.session = aiohttp.ClientSession()
+        self.buffer: Deque[Quote] = collections.deque(maxlen=BUFFER_SIZE)
+        self.recent: Dict[int, Deque[Quote]] = {}
+        self.refilled = asyncio.Event()
+        self.refill_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self.schedule_refill()
 
     async def cog_unload(self):
+        if self.refill_task is not None:
+            self.refill_task.cancel()
         await self.session.close()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
@@ -27,10 +48,78 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    def schedule_refill(self) -> None:
+        if self.refill_task is None or self.refill_task.done():
+            self.refill_task = asyncio.create_task(self.refill())
+
+    async def fetch_quotes(self) -> list:
+        async with self.session.get(self.api, ssl=False) as r:
+            if r.status != 200:
+                raise aiohttp.ClientResponseError(r.request_info, r.history, status=r.status)
+            return await r.json()
+
+    async def refill(self) -> None:
+        attempt = 0
+        while len(self.buffer) < LOW_WATER_MARK:
+            try:
+                data = await self.fetch_quotes()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                data = []
+            quotes = [
+                (q["a"], q["q"])
+                for q in data
+                if isinstance(q, dict) and q.get("a") and q.get("q")
+                # Rate limited requests get a single pseudo quote explaining so
+                and q["a"] != RATE_LIMIT_AUTHOR
+            ]
+            if quotes:
+                random.shuffle(quotes)
+                self.buffer.extend(quotes)
+                self.refilled.set()
+            if len(self.buffer) >= LOW_WATER_MARK:
+                break
+            # Full jitter backoff, the upstream API rate limits aggressively.
+            # Any batch which leaves the buffer low counts, not only failed ones.
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)))
+
+    def pop_quote(self, channel_id: int) -> Optional[Quote]:
+        recent = self.recent.setdefault(
+            channel_id, collections.deque(maxlen=RECENT_QUOTES_PER_CHANNEL)
+        )
+        fallback = None
+        for _ in range(len(self.buffer)):
+            quote = self.buffer.popleft()
+            if quote not in recent:
+                break
+            # Keep the quote around for other channels
+            self.buffer.append(quote)
+            fallback = fallback or quote
+        else:
+            if fallback is None:
+                return None
+            self.buffer.remove(fallback)
+            quote = fallback
+        recent.append(quote)
+        if len(self.buffer) < LOW_WATER_MARK:
+            self.schedule_refill()
+        return quote
+
     @commands.command()
     async def quote(self, ctx: commands.Context):
         """Get a random quote."""
-        async with ctx.typing():
-            async with self.session.get(self.api, ssl=False) as r:
-                content = (await r.json())[0]
-            await ctx.send(f"From **{content['a']}**\n{content['q']}")
+        quote = self.pop_quote(ctx.channel.id)
+        if quote is None:
+            async with ctx.typing():
+                self.refilled.clear()
+                self.schedule_refill()
+                try:
+                    await asyncio.wait_for(self.refilled.wait(), timeout=10)
+                except asyncio.TimeoutError:
+                    pass
+                quote = self.pop_quote(ctx.channel.id)
+            if quote is None:
+                await ctx.send("I couldn't fetch any quotes right now, please try again later.")
+                return
+        author, content = quote
+        await ctx.send(f"From **{author}**\n{content}")
@@ -1,29 +1,119 @@
-from typing import Any, Generator, NoReturn, TypeVar
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    NoReturn,
+    Optional,
+    OrderedDict,
+    Tuple,
+    TypeVar,
+)
 
 import aiohttp
 import discord
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.commands import FlagConverter
+from redbot.core.utils.views import SimpleMenu
+from redbot.vendored.discord.ext import menus
 
 T = TypeVar("T")
 
+CACHE_SIZE = 256
+CACHE_TTL = 60 * 60
+WORDS_PER_FIELD = 10
+FIELDS_PER_PAGE = 3
+
 
 def chunks(lst: list[T], n: int) -> Generator[list[T], None, None]:
     for i in range(0, len(lst), n):
         yield lst[i : i + n]
 
 
+class RhymeCache:
+    """A least recently used cache of rhymes, where entries expire after a set time."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+
+    def get(self, word: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            expires, value = self._data[word]
+        except KeyError:
+            return None
+        if expires < time.monotonic():
+            del self._data[word]
+            return None
+        self._data.move_to_end(word)
+        return value
+
+    def set(self, word: str, value: List[Dict[str, Any]]) -> None:
+        self._data[word] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(word)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class LazyPageSource(menus.PageSource):
+    """A page source which only formats pages when they are viewed."""
+
+    def __init__(self, page_count: int, formatter: Callable[[int], discord.Embed]):
+        self.page_count = page_count
+        self.formatter = formatter
+        self.cache: Dict[int, discord.Embed] = {}
+
+    def is_paginating(self) -> bool:
+        return self.page_count > 1
+
+    def get_max_pages(self) -> int:
+        return self.page_count
+
+    async def get_page(self, page_number: int) -> int:
+        if not 0 <= page_number < self.page_count:
+            raise IndexError(page_number)
+        return page_number
+
+    async def format_page(self, menu: SimpleMenu, page: int) -> discord.Embed:
+        if page not in self.cache:
+            self.cache[page] = self.formatter(page)
+        return self.cache[page]
+
+
+class LazyMenu(SimpleMenu):
+    def __init__(self, source: LazyPageSource, **kwargs: Any):
+        super().__init__(list(range(source.get_max_pages())), **kwargs)  # type: ignore[arg-type]
+        self._source = source
+
+
+class RhymeFlags(FlagConverter):
+    syllables: Optional[int] = commands.flag(name="syllables", default=None, aliases=["s"])
+    min_score: Optional[int] = commands.flag(name="min_score", default=None, aliases=["score"])
+
+    def check(self, rhyme: Dict[str, Any]) -> bool:
+        if self.syllables is not None and rhyme.get("numSyllables") != self.syllables:
+            return False
+        if self.min_score is not None and rhyme.get("score", 0) < self.min_score:
+            return False
+        return True
+
+
 class Rhymes(commands.Cog):
     """Generate rhymes."""
 
     __author__ = "Kreusada"
-    __version__ = "1.0.0"
+    __version__ = "1.1.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, 408953096836490568, True)
         self.config.register_global(blocked_words=[])
         self.session = aiohttp.ClientSession()
+        self.cache = RhymeCache()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -36,21 +126,49 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    async def get_rhymes(self, word: str) -> List[Dict[str, Any]]:
+        if (data := self.cache.get(word)) is not None:
+            return data
+        async with self.session.get(
+            "https://api.datamuse.com/words", params={"rel_rhy": word, "md": "s"}
+        ) as session:
+            data = await session.json()
+        self.cache.set(word, data)
+        return data
+
     @commands.has_permissions(embed_links=True)
     @commands.command()
-    async def rhymes(self, ctx: commands.Context, word: str):
-        """Get rhymes for a word."""
+    async def rhymes(self, ctx: commands.Context, word: str, *, flags: RhymeFlags):
+        """Get rhymes for a word.
+
+        Rhymes can be filtered by their number of syllables or by their minimum score.
+
+        **Examples:**
+        - `[p]rhymes orange`
+        - `[p]rhymes time syllables: 2`
+        - `[p]rhymes cat min_score: 1000`
+        """
+        word = word.lower()
         async with ctx.typing():
-            async with self.session.get(
-                "https://api.datamuse.com/words?rel_rhy=" + word
-            ) as session:
-                data = await session.json()
+            data = [rhyme for rhyme in await self.get_rhymes(word) if flags.check(rhyme)]
+        colour = await ctx.embed_colour()
+        per_page = WORDS_PER_FIELD * FIELDS_PER_PAGE
+        page_count = max(1, -(-len(data) // per_page))
+
+        def formatter(page: int) -> discord.Embed:
             embed = discord.Embed(
-                title=f"Words rhyming with '{word.lower()}' ({len(data)})",
-                colour=await ctx.embed_colour(),
+                title=f"Words rhyming with '{word}' ({len(data)})",
+                colour=colour,
             )
-            for rhymes in [
-                ["- " + rhyme["word"] for rhyme in chunk] for chunk in chunks(data, 10)
-            ]:
-                embed.add_field(name="\u2800", value="\n".join(rhymes))
-            await ctx.send(embed=embed)
+            for rhymes in chunks(data[page * per_page : (page + 1) * per_page], WORDS_PER_FIELD):
+                embed.add_field(
+                    name="\u2800", value="\n".join("- " + rhyme["word"] for rhyme in rhymes)
+                )
+            if page_count > 1:
+                embed.set_footer(text=f"Page {page + 1}/{page_count}")
+            return embed
+
+        if page_count == 1:
+            await ctx.send(embed=formatter(0))
+        else:
+            await LazyMenu(LazyPageSource(page_count, formatter)).start(ctx)
@@ -1,13 +1,17 @@
-from typing import Any, NoReturn
+from collections import Counter
+from typing import Any, Dict, Iterable, NoReturn
 
+import discord
 from redbot.core import commands
 from redbot.core.bot import Red
-from redbot.core.utils.views import SimpleMenu
 
 from .utils import (
+    MemberLeaderboard,
+    RoleBoardMenu,
+    RoleBoardPageSource,
     ValidRoleIndex,
     ValidUserIndex,
-    format_embed_pages,
+    count_role_members,
     get_members,
     get_roles,
 )
@@ -22,10 +26,12 @@ class RoleBoards(commands.Cog):
     """
 
     __author__ = "Kreusada"
-    __version__ = "3.2.1"
+    __version__ = "3.3.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
+        self.role_counts: Dict[int, Counter[int]] = {}
+        self.member_leaderboards: Dict[int, MemberLeaderboard] = {}
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         context = super().format_help_for_context(ctx)
@@ -35,6 +41,59 @@ async def red_delete_data_for_user(self, **kwargs: Any) -> NoReturn:
         """Nothing to delete."""
         raise NotImplementedError
 
+    def get_role_counts(self, guild: discord.Guild) -> Counter[int]:
+        if (counts := self.role_counts.get(guild.id)) is None:
+            counts = self.role_counts[guild.id] = count_role_members(guild)
+        return counts
+
+    def update_role_counts(
+        self, guild_id: int, *, added: Iterable[int] = (), removed: Iterable[int] = ()
+    ) -> None:
+        # Kept up to date as members change, rather than recounting the whole guild
+        if (counts := self.role_counts.get(guild_id)) is not None:
+            counts.update(added)
+            counts.subtract(removed)
+
+    def get_member_leaderboard(self, guild: discord.Guild) -> MemberLeaderboard:
+        if (leaderboard := self.member_leaderboards.get(guild.id)) is None:
+            leaderboard = self.member_leaderboards[guild.id] = MemberLeaderboard(guild)
+        return leaderboard
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before._roles != after._roles:
+            before_roles, after_roles = set(before._roles), set(after._roles)
+            self.update_role_counts(
+                after.guild.id,
+                added=after_roles - before_roles,
+                removed=before_roles - after_roles,
+            )
+            if (leaderboard := self.member_leaderboards.get(after.guild.id)) is not None:
+                leaderboard.update(after)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.update_role_counts(member.guild.id, added=member._roles)
+        if (leaderboard := self.member_leaderboards.get(member.guild.id)) is not None:
+            leaderboard.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.update_role_counts(member.guild.id, removed=member._roles)
+        if (leaderboard := self.member_leaderboards.get(member.guild.id)) is not None:
+            leaderboard.remove(member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        # Deleting a role strips it from every member without dispatching member updates
+        self.role_counts.pop(role.guild.id, None)
+        self.member_leaderboards.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.role_counts.pop(guild.id, None)
+        self.member_leaderboards.pop(guild.id, None)
+
     @commands.group(aliases=["roleboards", "rb"])
     @commands.guild_only()
     async def roleboard(self, ctx: commands.Context):
@@ -52,11 +111,15 @@ async def topmembers(self, ctx: commands.Context, index: ValidUserIndex):
         """
         if ctx.guild is None:
             return
-        data = get_members(ctx.guild, index=int(index))  # type: ignore[arg-type]
-        pages = format_embed_pages(
-            ctx, data=data, data_type="members", embed_colour=await ctx.embed_colour()
+        data = get_members(
+            ctx.guild,
+            index=int(index),  # type: ignore[arg-type]
+            leaderboard=self.get_member_leaderboard(ctx.guild),
+        )
+        source = RoleBoardPageSource(
+            ctx.guild, data=data, data_type="members", embed_colour=await ctx.embed_colour()
         )
-        menu = SimpleMenu(pages, use_select_menu=True)  # type: ignore[arg-type]
+        menu = RoleBoardMenu(source, use_select_menu=True)
         await menu.start(ctx)
 
     @roleboard.command()
@@ -70,9 +133,13 @@ async def toproles(self, ctx: commands.Context, index: ValidRoleIndex):
         """
         if ctx.guild is None:
             return
-        data = get_roles(ctx.guild, index=int(index))  # type: ignore[arg-type]
-        pages = format_embed_pages(
-            ctx, data=data, data_type="roles", embed_colour=await ctx.embed_colour()
+        data = get_roles(
+            ctx.guild,
+            index=int(index),  # type: ignore[arg-type]
+            counts=self.get_role_counts(ctx.guild),
+        )
+        source = RoleBoardPageSource(
+            ctx.guild, data=data, data_type="roles", embed_colour=await ctx.embed_colour()
         )
-        menu = SimpleMenu(pages, use_select_menu=True)  # type: ignore[arg-type]
+        menu = RoleBoardMenu(source, use_select_menu=True)
         await menu.start(ctx)
@@ -1,8 +1,24 @@
-from typing import Any, Generator, List, Literal, Sequence, Tuple
+import heapq
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    List,
+    Literal,
+    Optional,
+    OrderedDict,
+    Set,
+    Tuple,
+)
 
 import discord
 from redbot.core.commands import BadArgument, Context, Converter
 from redbot.core.utils.chat_formatting import box
+from redbot.core.utils.views import SimpleMenu
+from redbot.vendored.discord.ext import menus
+
+PAGE_CACHE_SIZE = 5
 
 
 class ValidRoleIndex(Converter):
@@ -39,50 +55,80 @@ async def convert(self, ctx: Context, argument: Any) -> int:  # type: ignore[ove
         return argument_int
 
 
-def format_embed_pages(
-    ctx: Context,
-    *,
-    data: List[List[Tuple[str, int]]],
-    data_type: Literal["roles", "members"],
-    embed_colour: discord.Colour,
-) -> Sequence[discord.Embed]:
-    pages = []
-    enum = 1
-
-    def two_digits(x: int) -> str:
-        return f"0{x}" if len(str(x)) == 1 else str(x)
+def two_digits(x: int) -> str:
+    return f"0{x}" if len(str(x)) == 1 else str(x)
 
-    reverse_types = {"roles": "members", "members": "roles"}
 
-    if ctx.guild is None:
-        return pages
+class RoleBoardPageSource(menus.PageSource):
+    """Format roleboard pages on demand, keeping the most recently viewed ones."""
 
-    total_data = len(getattr(ctx.guild, data_type))
-
-    if data_type == "roles":
-        total_data -= 1  # @everyone
+    reverse_types = {"roles": "members", "members": "roles"}
 
-    for sector in data:
+    def __init__(
+        self,
+        guild: discord.Guild,
+        *,
+        data: List[List[Tuple[str, int]]],
+        data_type: Literal["roles", "members"],
+        embed_colour: discord.Colour,
+    ):
+        self.guild = guild
+        self.data = data
+        self.data_type = data_type
+        self.embed_colour = embed_colour
+        self.entries = range(len(data))
+        self.cache: OrderedDict[int, discord.Embed] = OrderedDict()
+
+        self.total_data = len(getattr(guild, data_type))
+        if data_type == "roles":
+            self.total_data -= 1  # @everyone
+
+    def is_paginating(self) -> bool:
+        return len(self.data) > 1
+
+    def get_max_pages(self) -> int:
+        return len(self.data)
+
+    async def get_page(self, page_number: int) -> int:
+        if not 0 <= page_number < len(self.data):
+            raise IndexError(page_number)
+        return page_number
+
+    async def format_page(self, menu: SimpleMenu, page: int) -> discord.Embed:
+        if (embed := self.cache.get(page)) is not None:
+            self.cache.move_to_end(page)
+            return embed
+        embed = self.cache[page] = self.format_embed(page)
+        if len(self.cache) > PAGE_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return embed
+
+    def format_embed(self, page: int) -> discord.Embed:
         description = "\n".join(
-            f"#{two_digits(c)} [{two_digits(v[1])}] {v[0]}" for c, v in enumerate(sector, enum)
+            f"#{two_digits(c)} [{two_digits(v[1])}] {v[0]}"
+            for c, v in enumerate(self.data[page], page * 10 + 1)
         )
+        reverse_type = self.reverse_types[self.data_type]
         embed = discord.Embed(
-            title=f"{data_type.capitalize()} with the most {reverse_types[data_type]}",
+            title=f"{self.data_type.capitalize()} with the most {reverse_type}",
             description=box(description, lang="css"),
-            color=embed_colour,
+            color=self.embed_colour,
         )
 
-        embed.set_footer(text=f"Page {data.index(sector) + 1}/{len(data)}")
+        embed.set_footer(text=f"Page {page + 1}/{len(self.data)}")
 
         embed.set_author(
-            name=ctx.guild.name + f" | {total_data} {data_type}",
-            icon_url=ctx.guild.icon.url if ctx.guild.icon else None,
+            name=self.guild.name + f" | {self.total_data} {self.data_type}",
+            icon_url=self.guild.icon.url if self.guild.icon else None,
         )
+        return embed
 
-        pages.append(embed)
-        enum += 10
 
-    return pages
+class RoleBoardMenu(SimpleMenu):
+    def __init__(self, source: RoleBoardPageSource, **kwargs: Any):
+        # SimpleMenu only accepts a list of pages, so swap in the lazy source afterwards
+        super().__init__(list(source.entries), **kwargs)  # type: ignore[arg-type]
+        self._source = source
 
 
 def yield_chunks(
@@ -92,20 +138,91 @@ def yield_chunks(
         yield items[i : i + n]
 
 
-def get_roles(guild: discord.Guild, *, index: int) -> List[List[Tuple[str, int]]]:
+def count_role_members(guild: discord.Guild) -> Counter[int]:
+    """Count the members of every role in the guild with a single pass over its members."""
+    counts: Counter[int] = Counter()
+    for member in guild.members:
+        # Member.roles resolves and sorts role objects, the raw IDs are all we need here
+        counts.update(member._roles)
+    return counts
+
+
+def get_roles(
+    guild: discord.Guild, *, index: int, counts: Optional[Counter[int]] = None
+) -> List[List[Tuple[str, int]]]:
+    if counts is None:
+        counts = count_role_members(guild)
+
     def key(x: discord.Role) -> int:
-        return len(x.members)
+        return counts[x.id]
 
     roles = [r for r in guild.roles if r.id != guild.id]  # exclude @everyone
-    top_roles = sorted(roles, key=key, reverse=True)
-    data = [(x.name, len(x.members)) for x in top_roles[:index]]
+    top_roles = heapq.nlargest(index, roles, key=key)
+    data = [(x.name, counts[x.id]) for x in top_roles]
     return list(yield_chunks(data, 10))
 
 
-def get_members(guild: discord.Guild, *, index: int) -> List[List[Tuple[str, int]]]:
+class MemberLeaderboard:
+    """Members of a guild bucketed by their number of roles.
+
+    The buckets are kept up to date as members change, so that the top members
+    can be read off without sorting the whole guild.
+    """
+
+    def __init__(self, guild: discord.Guild):
+        self.role_counts: Dict[int, int] = {}
+        self.buckets: Dict[int, Set[int]] = {}
+        for member in guild.members:
+            self.update(member)
+
+    def __len__(self) -> int:
+        return len(self.role_counts)
+
+    def update(self, member: discord.Member) -> None:
+        count = len(member._roles)
+        previous = self.role_counts.get(member.id)
+        if previous == count:
+            return
+        if previous is not None:
+            self._discard(member.id, previous)
+        self.role_counts[member.id] = count
+        self.buckets.setdefault(count, set()).add(member.id)
+
+    def remove(self, member_id: int) -> None:
+        if (previous := self.role_counts.pop(member_id, None)) is not None:
+            self._discard(member_id, previous)
+
+    def _discard(self, member_id: int, count: int) -> None:
+        bucket = self.buckets[count]
+        bucket.discard(member_id)
+        if not bucket:
+            del self.buckets[count]
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        """Get the IDs and role counts of the ``k`` members with the most roles."""
+        ret: List[Tuple[int, int]] = []
+        # There can only be as many buckets as there are roles in the guild
+        for count in sorted(self.buckets, reverse=True):
+            for member_id in self.buckets[count]:
+                if len(ret) >= k:
+                    return ret
+                ret.append((member_id, count))
+        return ret
+
+
+def get_members(
+    guild: discord.Guild, *, index: int, leaderboard: Optional[MemberLeaderboard] = None
+) -> List[List[Tuple[str, int]]]:
+    if leaderboard is not None:
+        data = []
+        for member_id, count in leaderboard.top(index):
+            if (member := guild.get_member(member_id)) is not None:
+                data.append((member.display_name, count))
+        return list(yield_chunks(data, 10))
+
     def key(x: discord.Member) -> int:
-        return len(x.roles)
+        return len(x._roles)
 
-    top_members = sorted([x for x in guild.members], key=key, reverse=True)
-    data = [(x.display_name, len(x.roles) - 1) for x in top_members[:index]]
+    top_members = heapq.nlargest(index, guild.members, key=key)
+    data = [(x.display_name, len(x._roles)) for x in top_members]
     return list(yield_chunks(data, 10))